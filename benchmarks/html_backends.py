@@ -0,0 +1,95 @@
+"""Сравнение HTML-бэкендов на сохраненных страницах выдачи.
+
+Страницы можно сохранить режимом отладки (DEBUG_PARSER=1), они попадут в
+``debug_parser/``. Без аргументов скрипт берет оттуда все файлы, а если их
+нет — генерирует синтетическую выдачу для каждого сайта.
+
+    python benchmarks/html_backends.py [-n 20] [файлы...]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+os.environ.setdefault('TELEGRAM_TOKEN', 'benchmark')
+
+from parsers.html_backend import BACKENDS, resolve_backend  # noqa: E402
+from parsers.specs import SPECS  # noqa: E402
+
+# Префикс имени файла из debug_parser -> (описание карточек, базовый URL)
+SITES = {
+    'fl_ru': (SPECS['FL.ru'], 'https://www.fl.ru'),
+    'kwork_ru': (SPECS['Kwork.ru'], 'https://kwork.ru'),
+    'freelance_ru': (SPECS['Freelance.ru'], 'https://freelance.ru'),
+    'upwork': (SPECS['Upwork'], 'https://www.upwork.com'),
+}
+
+CARD_TEMPLATES = {
+    'fl_ru': '<div class="b-post"><a class="b-post__link" href="/projects/{i}/">Сайт {i}</a>'
+             '<div class="b-post__txt">Описание заказа {i}</div><div class="b-post__price">{i}00 ₽</div></div>',
+    'kwork_ru': '<div class="card card--order"><div class="card__title"><a href="/projects/{i}">Верстка {i}</a></div>'
+                '<div class="card__description">Описание {i}</div><div class="card__price">{i}00 ₽</div></div>',
+    'freelance_ru': '<div class="proj"><div class="ptitle"><a href="/project/{i}.html">Лендинг {i}</a></div>'
+                    '<div class="ptxt">Описание {i}</div></div>',
+    'upwork': '<section class="up-card-section"><a class="job-title-link" href="/job/~0{i}">Website {i}</a>'
+              '<p>Description {i}</p><span class="amount">${i}</span></section>',
+}
+
+
+def synthetic_page(site: str, cards: int = 50) -> str:
+    """Страница с шапкой, меню и скриптами вокруг карточек, как на реальных сайтах"""
+    noise = ''.join(f'<li><a href="/menu/{i}">Пункт {i}</a></li>' for i in range(300))
+    script = '<script>' + 'var x = 1;' * 2000 + '</script>'
+    body = ''.join(CARD_TEMPLATES[site].format(i=i) for i in range(cards))
+    return f'<html><head>{script}</head><body><ul>{noise}</ul><main>{body}</main><footer>{noise}</footer></body></html>'
+
+
+def load_pages(paths):
+    pages = []
+    for path in paths:
+        site = next((s for s in SITES if path.name.startswith(s)), None)
+        if site:
+            pages.append((site, path.name, path.read_text(encoding='utf-8', errors='replace')))
+    return pages
+
+
+def bench(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    args = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    args.add_argument('files', nargs='*', type=Path)
+    args.add_argument('-n', '--repeat', type=int, default=20)
+    opts = args.parse_args()
+
+    paths = opts.files or sorted((ROOT_DIR / 'debug_parser').glob('*.html'))
+    pages = load_pages(paths) or [(site, f'{site} (synthetic)', synthetic_page(site)) for site in SITES]
+    backends = [b for b in BACKENDS if resolve_backend(b) == b]
+
+    print(f"{'page':<40} {'variant':<26} {'ms/parse':>9} {'cards':>6}  same")
+    for site, name, html in pages:
+        spec, base_url = SITES[site]
+        strainer = spec.strainer
+        try:
+            # Эталон: полный DOM на html.parser, как было до выбора бэкенда
+            spec.strainer = ()
+            reference = spec.extract(html, base_url, 'html.parser')
+            variants = [('html.parser, full DOM', 'html.parser', ())]
+            variants += [(f'{b}, cards only', b, strainer) for b in backends]
+            for label, backend, cards in variants:
+                spec.strainer = cards
+                result = spec.extract(html, base_url, backend)
+                ms = bench(lambda: spec.extract(html, base_url, backend), opts.repeat)
+                print(f"{name[:40]:<40} {label:<26} {ms:>9.2f} {len(result):>6}  {result == reference}")
+        finally:
+            spec.strainer = strainer
+
+if __name__ == '__main__':
+    main()
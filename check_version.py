@@ -18,10 +18,3 @@ try:
     print(f"Version: {aiohttp.__version__}")
 except ImportError as e:
     print(f"\n=== aiohub not installed: {e}")
-
-try:
-    import requests
-    print("\n=== requests ===")
-    print(f"Version: {requests.__version__}")
-except ImportError as e:
-    print(f"\n=== requests not installed: {e}")
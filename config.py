@@ -14,19 +14,68 @@ TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
 # Настройки парсинга
 PARSING_INTERVAL = 30  # Минуты между проверками
+POLL_INTERVAL_MIN = float(os.getenv('POLL_INTERVAL_MIN', '5'))  # Самая частая проверка сайта (минуты)
+POLL_INTERVAL_MAX = float(os.getenv('POLL_INTERVAL_MAX', '60'))  # Самая редкая проверка сайта (минуты)
+POLL_JITTER = int(os.getenv('POLL_JITTER', '60'))  # Случайный сдвиг запуска (секунды)
+PARSER_TIMEOUT = float(os.getenv('PARSER_TIMEOUT', '180'))  # Предельное время одной проверки сайта (секунды)
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', '3'))  # Неудачных проверок подряд до паузы
+BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', '1800'))  # Пауза для недоступного сайта (секунды)
+JOB_MISFIRE_GRACE = int(os.getenv('JOB_MISFIRE_GRACE', '300'))  # Насколько запуск может опоздать (секунды)
+JOB_LAG_WARNING = float(os.getenv('JOB_LAG_WARNING', '30'))  # Отставание от расписания для предупреждения (секунды)
+# Включенные парсеры через запятую; модули остальных не импортируются
+ENABLED_PARSERS = [name.strip() for name in os.getenv('PARSERS', 'FreelanceRu,FLRu,KworkRu,Upwork').split(',') if name.strip()]
 CRON_EXPRESSION = os.getenv('CRON_EXPRESSION')  # Cron, если указан
 TIMEZONE = os.getenv('TIMEZONE', 'UTC')  # Часовой пояс планировщика
 MAX_RETRIES = 3       # Максимальное количество попыток при ошибке
+CRAWL_MAX_PAGES = int(os.getenv('CRAWL_MAX_PAGES', '5'))  # Страниц выдачи за одну проверку
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '2'))  # Процессов для разбора HTML (0 — в основном потоке)
+HTML_BACKEND = os.getenv('HTML_BACKEND', 'lxml')  # lxml, html.parser или selectolax
 RETRY_DELAY = 5       # Задержка между попытками (секунды)
 
+# Настройки HTTP-клиента (общий пул соединений для всех парсеров)
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '30'))  # Общий таймаут запроса (секунды)
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '10'))  # Таймаут соединения
+HTTP_LIMIT = int(os.getenv('HTTP_LIMIT', '20'))  # Всего соединений в пуле
+HTTP_LIMIT_PER_HOST = int(os.getenv('HTTP_LIMIT_PER_HOST', '4'))  # Соединений на один хост
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv('HTTP_KEEPALIVE_TIMEOUT', '120'))  # Keep-alive (секунды)
+HTTP_DNS_CACHE_TTL = int(os.getenv('HTTP_DNS_CACHE_TTL', '600'))  # Кэш DNS (секунды)
+HTTP_VERIFY_SSL = os.getenv('HTTP_VERIFY_SSL', '1') != '0'  # Проверка SSL-сертификатов
+# Условные запросы (ETag / Last-Modified) для страниц со списками заказов
+HTTP_CONDITIONAL_CACHE = os.getenv('HTTP_CONDITIONAL_CACHE', '1') != '0'
+
+# Адаптивное ограничение частоты запросов к каждому сайту (запросов в секунду)
+RATE_LIMIT_INITIAL = float(os.getenv('RATE_LIMIT_INITIAL', '0.5'))  # Стартовая частота
+RATE_LIMIT_MIN = float(os.getenv('RATE_LIMIT_MIN', '0.05'))  # Нижняя граница после блокировок
+RATE_LIMIT_MAX = float(os.getenv('RATE_LIMIT_MAX', '2'))  # Верхняя граница при успешных ответах
+RATE_LIMIT_BURST = float(os.getenv('RATE_LIMIT_BURST', '2'))  # Запросов подряд без ожидания
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '120'))  # Дольше Retry-After не ждем
+
+# Отправка уведомлений: лимиты Telegram (сообщений в секунду) и число обработчиков очереди
+TELEGRAM_RATE_GLOBAL = float(os.getenv('TELEGRAM_RATE_GLOBAL', '25'))  # На всего бота (лимит Telegram ~30)
+TELEGRAM_RATE_PER_CHAT = float(os.getenv('TELEGRAM_RATE_PER_CHAT', '1'))  # В один чат
+NOTIFY_WORKERS = int(os.getenv('NOTIFY_WORKERS', '2'))
+NOTIFY_DIGEST = os.getenv('NOTIFY_DIGEST', '0') == '1'  # Отправлять заказы сводками
+NOTIFY_DIGEST_WINDOW = float(os.getenv('NOTIFY_DIGEST_WINDOW', '30'))  # Сколько секунд копить сводку
+OUTBOX_RETRY_BASE = float(os.getenv('OUTBOX_RETRY_BASE', '10'))  # Первая пауза перед повтором отправки (секунды)
+OUTBOX_RETRY_MAX = float(os.getenv('OUTBOX_RETRY_MAX', '3600'))  # Самая длинная пауза между повторами
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', '12'))  # После стольких неудач уведомление удаляется
+
+# Индекс отправленных ссылок: фильтр Блума в файле рядом с базой
+SEEN_LINKS_CAPACITY = int(os.getenv('SEEN_LINKS_CAPACITY', '100000'))  # Ссылок до перестроения фильтра
+SEEN_LINKS_ERROR_RATE = float(os.getenv('SEEN_LINKS_ERROR_RATE', '0.001'))  # Доля ложных срабатываний
+SENT_LINKS_BATCH_SIZE = int(os.getenv('SENT_LINKS_BATCH_SIZE', '100'))  # Ссылок в одной транзакции
+SENT_LINKS_FLUSH_INTERVAL = float(os.getenv('SENT_LINKS_FLUSH_INTERVAL', '60'))  # Дольше не держим в памяти (секунды)
+SENT_LINKS_RETENTION_DAYS = float(os.getenv('SENT_LINKS_RETENTION_DAYS', '60'))  # Хранить ссылки (дни, 0 — всегда)
+ARCHIVE_RETENTION_DAYS = float(os.getenv('ARCHIVE_RETENTION_DAYS', '180'))  # Хранить архив заказов (дни, 0 — всегда)
+STORAGE_MAINTENANCE_HOURS = float(os.getenv('STORAGE_MAINTENANCE_HOURS', '24'))  # Очистка и VACUUM базы (часы)
+
 # Настройки логирования
 import logging
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
-# Создаем директорию для логов, если её нет
+# Директория для логов создается при настройке логгера, а не при импорте
 LOG_DIR = 'logs'
-Path(LOG_DIR).mkdir(exist_ok=True)
 
 # Основные настройки логирования
 LOG_LEVEL = logging.INFO
@@ -65,6 +114,7 @@ def setup_logger(name, log_config):
     logger.setLevel(log_config['level'])
     
     # Создаем обработчик с ротацией
+    Path(log_config['filename']).parent.mkdir(parents=True, exist_ok=True)
     handler = RotatingFileHandler(
         filename=log_config['filename'],
         maxBytes=log_config['maxBytes'],
@@ -88,12 +138,14 @@ def setup_logger(name, log_config):
     
     return logger
 
-# Настройки парсинга
+# Заголовки по умолчанию: первый профиль пула parsers/headers.py, остальные
+# профили читаются из HEADER_PROFILES_FILE
 HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
     'Accept-Language': 'ru-RU,ru;q=0.8,en-US;q=0.5,en;q=0.3',
     'Accept-Encoding': 'gzip, deflate, br',
     'Connection': 'keep-alive',
     'Upgrade-Insecure-Requests': '1'
 }
+HEADER_PROFILES_FILE = os.getenv('HEADER_PROFILES_FILE', str(Path(__file__).parent / 'parsers' / 'header_profiles.json'))
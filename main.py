@@ -1,126 +1,275 @@
 import asyncio
 import os
 import logging
+import time
+from datetime import datetime
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from parsers.freelance_ru import FreelanceRuParser
-from parsers.fl_ru import FLRuParser
-from parsers.kwork_ru import KworkRuParser
-from parsers.upwork import UpworkParser
-from utils.notifier import notify_user, notify_start, notify_stop, set_application
+from parsers import registry
+from utils import notifier
+from utils.notifier import notify_start, notify_stop, set_application
 from utils.telegram_bot import create_application
-from utils import storage
+from utils import async_storage, keywords, seen_links, storage
+from utils.circuit_breaker import CircuitBreaker
+from utils.polling import AdaptivePollInterval
 from config import (
     PARSING_INTERVAL,
+    POLL_JITTER,
+    PARSER_TIMEOUT,
+    JOB_MISFIRE_GRACE,
+    JOB_LAG_WARNING,
     CRON_EXPRESSION,
     TIMEZONE,
+    SENT_LINKS_RETENTION_DAYS,
+    ARCHIVE_RETENTION_DAYS,
+    STORAGE_MAINTENANCE_HOURS,
     LOG_FILES,
     setup_logger
 )
 
-# Настройка логирования
-logger = setup_logger(__name__, LOG_FILES['bot'])
-logger.info("=" * 50)
-logger.info("Starting application")
-logger.info("=" * 50)
+# Обработчик файла логов добавляется в bootstrap(), а не при импорте
+logger = logging.getLogger(__name__)
 
-# Выводим переменные окружения для отладки
-logger.info("Проверка переменных окружения:")
-for var in ['TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID', 'CRON_EXPRESSION']:
-    logger.info(f"{var} = {'установлен' if os.getenv(var) else 'не установлен'}")
+# Сколько секунд при остановке ждать отправки уведомлений из очереди
+NOTIFY_DRAIN_TIMEOUT = 10
 
-async def async_job():
-    """Асинхронная версия основной функции"""
-    logger.info("🔍 Запускаю асинхронный поиск заказов...")
-    
-    parsers = [
-        ("FreelanceRu", FreelanceRuParser()),
-        ("FLRu", FLRuParser()),
-        ("KworkRu", KworkRuParser()),
-        ("Upwork", UpworkParser()),
-    ]
-    
+_scheduler = None
+# Интервал проверки каждого сайта подстраивается под частоту новых заказов
+_intervals = {}
+# Сайты, проверка которых идет прямо сейчас: один цикл на сайт одновременно
+_running = set()
+# Не больше одного запуска задачи одновременно; пропущенные запуски
+# (долгий цикл, перезапуск бота) сливаются в один
+JOB_DEFAULTS = {
+    'max_instances': 1,
+    'coalesce': True,
+    'misfire_grace_time': JOB_MISFIRE_GRACE,
+}
+# Недоступные сайты пропускаются до конца паузы; состояние хранится в базе
+_breaker = CircuitBreaker()
+
+
+async def _stream_parser(name, parser) -> int:
+    """Передает заказы парсера в очередь отправки по мере разбора страниц.
+
+    Возвращает число новых заказов: уже отправленные и ждущие в очереди не
+    считаются, иначе интервал проверки никогда не увеличивался бы.
+    """
+    logger.info(f"Запускаю парсер {name}...")
+    found = 0
+    async for projects in parser.stream_projects():
+        # Заказы сохраняются в очередь отправки одной транзакцией, их
+        # отправляют обработчики с учетом лимитов Telegram
+        found += await notifier.enqueue_projects(projects)
+    return found
+
+
+async def _run_parser(name, parser) -> int:
+    """Проверяет сайт за PARSER_TIMEOUT секунд, если предохранитель его пропускает.
+
+    Заказы, отправленные в очередь до ошибки или таймаута, не теряются.
+    """
+    if name in _running:
+        logger.warning(f"Парсер {name} пропущен: предыдущая проверка еще идет")
+        return 0
+    # Отмечаем сайт до первого await, чтобы второй вызов не проскочил проверку
+    _running.add(name)
     try:
-        # Запускаем все парсеры параллельно
-        tasks = []
-        for name, parser in parsers:
-            logger.info(f"Запускаю парсер {name}...")
-            tasks.append(parser.async_find_projects())
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Обрабатываем результаты
-        for (name, _), result in zip(parsers, results):
-            if isinstance(result, Exception):
-                logger.error(f"Ошибка в парсере {name}: {str(result)}", exc_info=result)
-            elif result and isinstance(result, list):
-                logger.info(f"Парсер {name} нашел {len(result)} проектов")
-                # Отправляем уведомления о новых проектах
-                for project in result:
-                    try:
-                        await notify_user(project)
-                        await asyncio.sleep(1)  # Небольшая задержка между сообщениями
-                    except Exception as e:
-                        logger.error(f"Ошибка при отправке уведомления: {e}")
-            else:
-                logger.info(f"Парсер {name} не нашел проектов")
-        
+        if not await _breaker.allow(name):
+            logger.info(f"Парсер {name} пропущен: сайт недоступен, ждем окончания паузы")
+            return 0
+        found = await asyncio.wait_for(_stream_parser(name, parser), PARSER_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.error(f"Парсер {name} не уложился в {PARSER_TIMEOUT:g} с")
+        await _breaker.record_failure(name)
+        return 0
     except Exception as e:
-        error_msg = f"Асинхронная ошибка: {e}"
-        logger.critical(error_msg, exc_info=True)
-        try:
-            await notify_user({"title": "Ошибка", "description": error_msg, "link": ""})
-        except Exception as notify_err:
-            logger.error(f"Не удалось отправить уведомление об ошибке: {notify_err}")
+        logger.error(f"Ошибка в парсере {name}: {str(e)}", exc_info=e)
+        await _breaker.record_failure(name)
+        return 0
+    finally:
+        _running.discard(name)
+
+    if found:
+        logger.info(f"Парсер {name} нашел {found} новых проектов")
+    else:
+        logger.info(f"Парсер {name} не нашел новых проектов")
+    # Ошибки запросов без единого заказа тоже считаются неудачной проверкой
+    if getattr(parser, 'request_errors', 0) and not found:
+        await _breaker.record_failure(name)
+    else:
+        await _breaker.record_success(name)
+    return found
+
+
+async def maintenance_job():
+    """Удаляет старые отправленные ссылки и заказы из архива и сжимает базу"""
+    logger.info("🧹 Обслуживание базы...")
+    try:
+        await async_storage.run(storage.maintain, SENT_LINKS_RETENTION_DAYS, ARCHIVE_RETENTION_DAYS)
+    except Exception as e:
+        logger.error(f"Ошибка обслуживания базы: {e}", exc_info=True)
+
+def _parse_job_id(name: str) -> str:
+    return f'parse_{name}'
+
+
+async def parse_source_job(name: str) -> None:
+    """Проверяет один сайт и подстраивает интервал его следующей проверки"""
+    parser = registry.get_parser(name)
+    try:
+        found = await _run_parser(name, parser)
+    finally:
+        await async_storage.flush_sent_links()
+
+    interval = _intervals.get(name)
+    if interval is None or _scheduler is None:
+        return
+    previous = interval.minutes
+    minutes = interval.update(found)
+    if minutes != previous:
+        logger.info(f"Интервал проверки {name}: {previous:g} -> {minutes:g} мин")
+        _scheduler.reschedule_job(
+            _parse_job_id(name), trigger='interval', minutes=minutes, jitter=POLL_JITTER
+        )
+
+
+def _add_parse_jobs(scheduler: AsyncIOScheduler, trigger=None) -> None:
+    """Добавляет задачу проверки для каждого сайта.
+
+    Без CRON_EXPRESSION интервал каждой задачи меняется от POLL_INTERVAL_MIN до
+    POLL_INTERVAL_MAX, а случайный сдвиг POLL_JITTER не дает всем сайтам
+    запрашиваться одновременно.
+    """
+    _intervals.clear()
+    for name in registry.enabled_parsers():
+        if trigger is not None:
+            scheduler.add_job(
+                parse_source_job,
+                trigger,
+                args=[name],
+                id=_parse_job_id(name),
+                name=f'Parse {name}',
+                replace_existing=True
+            )
+            continue
+        interval = _intervals[name] = AdaptivePollInterval(PARSING_INTERVAL)
+        scheduler.add_job(
+            parse_source_job,
+            'interval',
+            minutes=interval.minutes,
+            jitter=POLL_JITTER,
+            args=[name],
+            id=_parse_job_id(name),
+            name=f'Parse {name}',
+            replace_existing=True
+        )
+
+
+def _on_job_event(event) -> None:
+    """Пишет в лог отставание запусков от расписания и пропущенные запуски"""
+    if event.code == EVENT_JOB_SUBMITTED:
+        scheduled = min(event.scheduled_run_times)
+        lag = (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()
+        merged = len(event.scheduled_run_times)
+        message = f"Задача {event.job_id} запущена с отставанием {lag:.1f} с"
+        if merged > 1:
+            message += f", объединено запусков: {merged}"
+        if lag > JOB_LAG_WARNING or merged > 1:
+            logger.warning(message)
+        else:
+            logger.debug(message)
+    elif event.code == EVENT_JOB_MAX_INSTANCES:
+        logger.warning(f"Задача {event.job_id} пропущена: предыдущий запуск еще идет")
+    elif event.code == EVENT_JOB_MISSED:
+        logger.warning(f"Задача {event.job_id} пропущена: опоздание больше {JOB_MISFIRE_GRACE} с")
+
+
+def run_parse_jobs_now(scheduler: AsyncIOScheduler) -> None:
+    """Переносит ближайший запуск проверок сайтов на текущий момент.
+
+    Первая проверка после старта идет через планировщик, поэтому не может
+    пересечься с плановой.
+    """
+    for name in registry.enabled_parsers():
+        scheduler.modify_job(_parse_job_id(name), next_run_time=datetime.now(scheduler.timezone))
+
 
 def create_scheduler() -> AsyncIOScheduler:
-    scheduler = AsyncIOScheduler(timezone=TIMEZONE)
+    global _scheduler
+    scheduler = _scheduler = AsyncIOScheduler(timezone=TIMEZONE, job_defaults=JOB_DEFAULTS)
+    scheduler.add_listener(_on_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+
+    if STORAGE_MAINTENANCE_HOURS > 0:
+        scheduler.add_job(
+            maintenance_job,
+            "interval",
+            hours=STORAGE_MAINTENANCE_HOURS,
+            id='maintenance_job',
+            name='Storage maintenance',
+            replace_existing=True
+        )
     
     if CRON_EXPRESSION:
-        logger.info(f"Setting up cron job with expression: {CRON_EXPRESSION}")
+        logger.info(f"Setting up cron jobs with expression: {CRON_EXPRESSION}")
         try:
             trigger = CronTrigger.from_crontab(CRON_EXPRESSION)
-            job = scheduler.add_job(
-                async_job,
-                trigger,
-                id='parse_job',
-                name='Parse job',
-                replace_existing=True
-            )
-            logger.info(f"Added cron job: {job}")
         except Exception as e:
             logger.error(f"Error creating cron trigger: {e}")
             logger.info("Falling back to interval-based scheduling")
-            scheduler.add_job(
-                async_job,
-                "interval",
-                minutes=PARSING_INTERVAL,
-                id='parse_job',
-                name='Parse job',
-                replace_existing=True
-            )
+            trigger = None
+        _add_parse_jobs(scheduler, trigger)
     else:
-        logger.info(f"Setting up interval job with {PARSING_INTERVAL} minutes interval")
-        scheduler.add_job(
-            async_job,
-            "interval",
-            minutes=PARSING_INTERVAL,
-            id='parse_job',
-            name='Parse job',
-            replace_existing=True
-        )
+        logger.info(f"Setting up adaptive interval jobs starting at {PARSING_INTERVAL} minutes")
+        _add_parse_jobs(scheduler)
     
     logger.info("Scheduler created with jobs: %s", scheduler.get_jobs())
     return scheduler
 
 
+def _log_environment() -> None:
+    # Выводим переменные окружения для отладки
+    logger.info("Проверка переменных окружения:")
+    for var in ['TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID', 'CRON_EXPRESSION']:
+        logger.info(f"{var} = {'установлен' if os.getenv(var) else 'не установлен'}")
+
+
+def bootstrap() -> dict:
+    """Готовит приложение к запуску и возвращает длительность каждого шага (с).
+
+    Импорт модулей ничего не создает на диске и не открывает базу: логи,
+    база, ключевые слова и индекс отправленных ссылок поднимаются здесь,
+    явно и с замером времени.
+    """
+    timings = {}
+
+    def step(name, func):
+        started = time.perf_counter()
+        func()
+        timings[name] = time.perf_counter() - started
+
+    step('logging', lambda: setup_logger(__name__, LOG_FILES['bot']))
+    logger.info("=" * 50)
+    logger.info("Starting application")
+    logger.info("=" * 50)
+    _log_environment()
+    step('storage', storage.init)
+    step('keywords', keywords.load)
+    step('sent_links', seen_links.get_index)
+    logger.info(
+        "Bootstrap: %s",
+        ", ".join(f"{name} {seconds * 1000:.1f} мс" for name, seconds in timings.items()),
+    )
+    return timings
+
+
 async def main() -> None:
     application = None
     scheduler = None
     
     try:
-        logger.info("Initializing storage...")
-        storage.init()
+        bootstrap()
         logger.info("Starting application...")
         
         # Create and start scheduler
@@ -138,6 +287,7 @@ async def main() -> None:
         # Initialize and start the application
         await application.initialize()
         await application.start()
+        notifier.start_workers()
         
         logger.info("Setting up bot commands...")
         try:
@@ -145,7 +295,8 @@ async def main() -> None:
                 ("start", "Запустить бота"),
                 ("addkeyword", "Добавить ключевое слово"),
                 ("removekeyword", "Удалить ключевое слово"),
-                ("list", "Список ключевых слов")
+                ("list", "Список ключевых слов"),
+                ("search", "Поиск по архиву заказов")
             ])
             logger.info("Bot commands set up successfully")
         except Exception as e:
@@ -156,13 +307,9 @@ async def main() -> None:
         await asyncio.sleep(1)
         await notify_start()
         
-        # Run the job immediately on startup
-        logger.info("Running initial job...")
-        try:
-            await async_job()
-            logger.info("Initial job completed successfully")
-        except Exception as e:
-            logger.error(f"Error in initial job: {e}", exc_info=True)
+        # Run the parse jobs immediately on startup, through the scheduler
+        logger.info("Scheduling initial parse jobs...")
+        run_parse_jobs_now(scheduler)
         
         logger.info("Bot is now running. Press Ctrl+C to stop.")
         
@@ -180,12 +327,18 @@ async def main() -> None:
             logger.info("Shutting down scheduler...")
             scheduler.shutdown()
         
+        await notifier.stop_workers(timeout=NOTIFY_DRAIN_TIMEOUT)
+
         if application and application.running:
             logger.info("Stopping Telegram application...")
             await application.stop()
             logger.info("Telegram application stopped")
             await notify_stop()
 
+        await registry.close()
+        async_storage.shutdown()
+        storage.flush_sent_links()
+
 if __name__ == "__main__":
     # Запускаем асинхронную версию по умолчанию
     asyncio.run(main())
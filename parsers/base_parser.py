@@ -1,41 +1,203 @@
 import os
 import logging
 import time
-import aiohttp
-import requests
-from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+import hashlib
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from abc import ABC
+from typing import AsyncIterator, List, Dict, Optional, Any, Callable
 from pathlib import Path
+from config import HTTP_CONDITIONAL_CACHE, CRAWL_MAX_PAGES, PARSE_WORKERS
+from utils import async_storage, keywords
+from utils.links import link_key
+from utils.matcher import KeywordMatcher
+from utils.rate_limit import RateLimitExceeded
+from .fetcher import HttpFetcher, get_fetcher
+from .specs import SPECS, extract_listing
 
 logger = logging.getLogger(__name__)
 
-# Create debug directory if it doesn't exist
+# Директория создается при первом сохранении отладочного HTML
 DEBUG_DIR = Path("debug_parser")
-DEBUG_DIR.mkdir(exist_ok=True)
+
+_parse_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_parse_executor() -> Optional[ProcessPoolExecutor]:
+    """Возвращает общий пул процессов для разбора HTML (None, если он отключен)"""
+    global _parse_executor
+    if PARSE_WORKERS <= 0:
+        return None
+    if _parse_executor is None:
+        # spawn: процесс бота многопоточный, fork в нем небезопасен
+        _parse_executor = ProcessPoolExecutor(
+            max_workers=PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_executor
+
+
+def shutdown_parse_executor() -> None:
+    """Останавливает пул процессов разбора при завершении приложения"""
+    global _parse_executor
+    if _parse_executor is not None:
+        _parse_executor.shutdown(wait=False, cancel_futures=True)
+        _parse_executor = None
 
 class BaseParser(ABC):
-    def __init__(self, name: str, base_url: str):
+    max_pages = CRAWL_MAX_PAGES
+
+    def __init__(self, name: str, base_url: str, fetcher: Optional[HttpFetcher] = None):
         self.name = name
         self.base_url = base_url
+        self.fetcher = fetcher or get_fetcher()
         self.logger = logging.getLogger(f"parser.{name}")
         self.debug_mode = os.getenv("DEBUG_PARSER") == "1"
+        # Валидаторы прочитанных страниц: сохраняются только после обработки обхода
+        self._pending_validators: Dict[str, tuple] = {}
+        # Неудачные запросы последнего обхода: по ним main решает, доступен ли сайт
+        self.request_errors = 0
+
+    async def async_find_projects(self) -> List[Dict]:
+        """Асинхронно ищет проекты на платформе и возвращает их одним списком"""
+        try:
+            filtered = [project async for batch in self.stream_projects() for project in batch]
+            self._log_projects(filtered)
+            return filtered
+        except Exception as e:
+            self.logger.error(f"Ошибка парсера: {e}")
+            raise
+
+    async def stream_projects(self) -> AsyncIterator[List[Dict]]:
+        """Отдает подходящие заказы по страницам, не дожидаясь конца обхода.
+
+        Страницы выдачи читаются через общий пул соединений до метки прошлой
+        проверки; неизменившиеся страницы не разбираются.
+        """
+        self.logger.info(f"🔍 Ищу заказы на {self.name}...")
+        matcher = keywords.get_matcher()
+        async for items in self._crawl_pages():
+            filtered = self._filter_projects(items, matcher)
+            if filtered:
+                yield filtered
 
-    @abstractmethod
     def find_projects(self) -> List[Dict]:
-        """Находит проекты на платформе"""
-        pass
+        """Синхронная версия для обратной совместимости"""
+        return asyncio.run(self.async_find_projects())
+
+    async def _async_parse_response(self, html: str) -> List[Dict]:
+        """Разбирает страницу выдачи в список проектов без фильтрации по описанию из SPECS"""
+        if self.name not in SPECS:
+            raise NotImplementedError(f"Нет описания карточек для {self.name}")
+        return await self._parse_in_executor(extract_listing, self.name, html, self.base_url)
+
+    async def _parse_in_executor(self, func: Callable[..., List[Dict]], *args: Any) -> List[Dict]:
+        """Выполняет разбор HTML в пуле процессов, не занимая цикл событий.
+
+        ``func`` должна быть функцией уровня модуля и возвращать простые словари,
+        чтобы аргументы и результат можно было передать между процессами.
+        """
+        global _parse_executor
+        executor = get_parse_executor()
+        if executor is None:
+            return func(*args)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        except BrokenProcessPool:
+            self.logger.error("Пул процессов разбора аварийно завершился, разбираю в основном процессе")
+            _parse_executor = None
+            return func(*args)
+
+    def _page_url(self, page: int) -> str:
+        """Возвращает URL страницы выдачи (нумерация с 1)"""
+        if page == 1:
+            return self.search_url
+        return f"{self.search_url}?page={page}"
+
+    async def _fetch_page(self, page: int) -> List[Dict]:
+        """Загружает и разбирает одну страницу выдачи"""
+        html = await self._make_request(self._page_url(page), conditional=True)
+        if not html:
+            return []
+        return await self._async_parse_response(html)
+
+    async def _crawl(self) -> List[Dict]:
+        """Обходит страницы выдачи и возвращает все новые заказы списком"""
+        return [item async for items in self._crawl_pages() for item in items]
+
+    async def _crawl_pages(self) -> AsyncIterator[List[Dict]]:
+        """Обходит страницы выдачи до метки, оставленной прошлой проверкой.
+
+        Новые заказы каждой страницы отдаются сразу после её разбора.
+        Метка — ссылки с первой страницы прошлого обхода. Страница считается
+        дошедшей до метки, если метка встречается во второй её половине:
+        закрепленные заказы висят в начале выдачи и не должны останавливать обход.
+        При первом запуске (метки нет) читается только первая страница.
+        """
+        # Ссылки сравниваются по каноническому ключу: один и тот же заказ
+        # может прийти с другими параметрами запроса или без слеша в конце
+        mark = {link_key(link) for link in await async_storage.load_crawl_mark(self.name)}
+        self._pending_validators.clear()
+        self.request_errors = 0
+        projects: List[Dict] = []
+        known_keys = set()
+        newest: List[str] = []
+
+        for page in range(1, self.max_pages + 1):
+            items = await self._fetch_page(page)
+            if not items:
+                break
+
+            links = [item.get('link') or '' for item in items]
+            keys = [link_key(link) for link in links]
+            if not newest:
+                newest = links
+            fresh = []
+            for item, key in zip(items, keys):
+                # Заказы сдвигаются между страницами во время обхода
+                if key not in known_keys:
+                    known_keys.add(key)
+                    fresh.append(item)
+            projects.extend(fresh)
+            if fresh:
+                yield fresh
+
+            if not mark or any(key in mark for key in keys[len(keys) // 2:]):
+                break
+        else:
+            self.logger.warning(
+                f"Обход {self.name} остановлен на лимите {self.max_pages} страниц, метка не найдена"
+            )
+
+        if newest:
+            await async_storage.save_crawl_mark(self.name, newest)
+        # В архив попадают все прочитанные заказы, а не только прошедшие фильтр
+        await async_storage.archive_projects(projects, self.name)
+        # Если обход упал раньше, следующая проверка получит страницы заново
+        # и не потеряет их заказы из-за 304 или совпавшего хэша
+        for url, validators in self._pending_validators.items():
+            await async_storage.save_http_validators(url, *validators)
+        self._pending_validators.clear()
+
+    def _filter_projects(self, projects: List[Dict], matcher: Optional[KeywordMatcher] = None) -> List[Dict]:
+        """Фильтрует проекты по ключевым словам.
+
+        Заголовок и описание каждой карточки просматриваются автоматом один раз;
+        найденные ключевые слова сохраняются в поле ``keywords`` проекта.
+        """
+        if matcher is None:
+            matcher = keywords.get_matcher()
 
-    def _filter_projects(self, projects: List[Dict], keywords: List[str], exclude_words: List[str]) -> List[Dict]:
-        """Фильтрует проекты по ключевым словам"""
         filtered = []
         for project in projects:
-            text = f"{project.get('title', '')} {project.get('description', '')}".lower()
-            
-            # Проверяем наличие ключевых слов и отсутствие исключающих слов
-            if (any(keyword in text for keyword in keywords) and
-                not any(exclude in text for exclude in exclude_words)):
+            matched = matcher.match(f"{project.get('title', '')} {project.get('description', '')}")
+            if matched:
+                project['keywords'] = matched
+                project.setdefault('source', self.name)
                 filtered.append(project)
-        
+
         return filtered
 
     def _save_debug_html(self, html: str, prefix: str = "") -> None:
@@ -48,28 +210,70 @@ class BaseParser(ABC):
         filepath = DEBUG_DIR / filename
         
         try:
+            DEBUG_DIR.mkdir(exist_ok=True)
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(html[:100000])  # Save first 100KB to avoid huge files
             self.logger.debug(f"Сохранен отладочный HTML в {filepath}")
         except Exception as e:
             self.logger.error(f"Ошибка при сохранении отладочного HTML: {e}")
 
-    async def _make_request(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[str]:
-        """Выполняет HTTP-запрос с сохранением отладочной информации"""
+    async def _make_request(self, url: str, conditional: bool = False, **kwargs: Any) -> Optional[str]:
+        """Выполняет HTTP-запрос через общий клиент с сохранением отладочной информации.
+
+        При ``conditional=True`` отправляет сохраненные ETag/Last-Modified и
+        возвращает ``None``, если страница не изменилась с прошлой проверки
+        (ответ 304 или тот же хэш тела), чтобы парсер не разбирал её повторно.
+        Новые валидаторы записываются в конце обхода.
+        """
         try:
-            if session:
-                async with session.get(url) as response:
-                    text = await response.text()
-                    if self.debug_mode:
-                        self._save_debug_html(text, f"{response.status}")
-                    return text
-            else:
-                response = requests.get(url, timeout=30)
-                if self.debug_mode:
-                    self._save_debug_html(response.text, str(response.status_code))
-                return response.text
+            cached = None
+            variant = None
+            if conditional and HTTP_CONDITIONAL_CACHE:
+                # После изменения ключевых слов страницу нужно разобрать заново
+                variant = keywords.get_matcher().fingerprint
+                cached = await async_storage.load_http_validators(url)
+                if cached and cached[3] != variant:
+                    cached = None
+                if cached:
+                    etag, last_modified = cached[0], cached[1]
+                    headers = dict(kwargs.pop("headers", None) or {})
+                    if etag:
+                        headers["If-None-Match"] = etag
+                    if last_modified:
+                        headers["If-Modified-Since"] = last_modified
+                    kwargs["headers"] = headers
+
+            response = await self.fetcher.fetch(url, **kwargs)
+            if self.debug_mode:
+                self._save_debug_html(response.text, str(response.status))
+
+            if response.status == 304 and cached:
+                self.logger.info(f"Страница {url} не изменилась (304), разбор пропущен")
+                return None
+            if response.status != 200:
+                self.logger.error(f"HTTP ошибка {response.status} при запросе {url}")
+                self.request_errors += 1
+                return None
+
+            if variant is not None:
+                body_hash = hashlib.sha1(response.text.encode("utf-8")).hexdigest()
+                self._pending_validators[url] = (
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    body_hash,
+                    variant,
+                )
+                if cached and cached[2] == body_hash:
+                    self.logger.info(f"Содержимое {url} не изменилось, разбор пропущен")
+                    return None
+
+            return response.text
+        except RateLimitExceeded as e:
+            self.logger.warning(f"Запрос {url} отложен до следующей проверки: {e}")
+            return None
         except Exception as e:
             self.logger.error(f"Ошибка при запросе {url}: {e}")
+            self.request_errors += 1
             return None
 
     def _log_projects(self, projects: List[Dict]):
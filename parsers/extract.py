@@ -0,0 +1,150 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+import soupsieve
+from .html_backend import CardFilter, make_soup, resolve_backend
+
+Selectors = Tuple[str, ...]
+
+# Простой селектор контейнера вида "div.b-post" или ".card" можно проверить
+# еще во время разбора, без построения дерева
+_SIMPLE_SELECTOR = re.compile(r'^([a-z][a-z0-9]*)?(?:\.([\w-]+))?$', re.IGNORECASE)
+
+
+def _as_tuple(selectors: Any) -> Selectors:
+    if not selectors:
+        return ()
+    if isinstance(selectors, str):
+        return (selectors,)
+    return tuple(selectors)
+
+
+def card_filters(selectors: Sequence[str]) -> Tuple[CardFilter, ...]:
+    """Фильтры SoupStrainer для селекторов карточки.
+
+    Если хотя бы один селектор сложнее "тег.класс", фильтрации нет: иначе
+    карточки, найденные запасным селектором, не попали бы в дерево.
+    """
+    filters = []
+    for selector in selectors:
+        match = _SIMPLE_SELECTOR.match(selector.strip())
+        if not match or not any(match.groups()):
+            return ()
+        filters.append((match.group(1), match.group(2)))
+    return tuple(filters)
+
+
+class ListingSpec:
+    """Декларативное описание карточек заказа на странице выдачи.
+
+    Каждое поле задается селектором или кортежем селекторов: первый основной,
+    остальные запасные на случай смены верстки. Ссылка берется из атрибута
+    ``link_attr`` элемента ``link`` (по умолчанию — заголовка). Поле ``price``
+    без селекторов не попадает в результат. Селекторы компилируются один раз
+    при создании описания.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        cards: Any,
+        title: Any,
+        description: Any = (),
+        price: Any = (),
+        link: Any = (),
+        link_attr: str = 'href',
+        required: Sequence[str] = ('title',),
+        default_price: str = "Цена не указана",
+    ):
+        self.name = name
+        self.cards = _as_tuple(cards)
+        self.fields: Dict[str, Selectors] = {
+            'title': _as_tuple(title),
+            'link': _as_tuple(link),
+            'description': _as_tuple(description),
+            'price': _as_tuple(price),
+        }
+        self.link_attr = link_attr
+        self.required = tuple(required)
+        self.default_price = default_price
+        self.strainer = card_filters(self.cards)
+        self.logger = logging.getLogger(f"parser.{name}")
+        # soupsieve разбирает селектор при каждом select_one, поэтому для
+        # BeautifulSoup храним скомпилированные шаблоны; selectolax (lexbor)
+        # принимает строки и разбирает их в C
+        self._cards = tuple(soupsieve.compile(s) for s in self.cards)
+        self._fields = {key: tuple(soupsieve.compile(s) for s in sels) for key, sels in self.fields.items()}
+
+    def extract(self, html: str, base_url: str, backend: Optional[str] = None) -> List[Dict]:
+        """Разбирает страницу и возвращает карточки (может выполняться в процессе-обработчике)"""
+        backend = resolve_backend(backend)
+        root = make_soup(html, self.strainer, backend)
+        if backend == 'selectolax':
+            return self._extract(root, base_url, _LEXBOR, self.cards, self.fields)
+        return self._extract(root, base_url, _SOUP, self._cards, self._fields)
+
+    def _extract(self, root: Any, base_url: str, ops: '_Ops', cards: Sequence, fields: Dict) -> List[Dict]:
+        items: List[Any] = []
+        for pattern in cards:
+            items = ops.select(root, pattern)
+            if items:
+                break
+
+        title_sels, link_sels = fields['title'], fields['link']
+        desc_sels, price_sels = fields['description'], fields['price']
+        projects = []
+        for item in items:
+            try:
+                title = ops.first(item, title_sels)
+                link = ops.first(item, link_sels) if link_sels else title
+                desc = ops.first(item, desc_sels)
+                href = ops.attr(link, self.link_attr) if link is not None else None
+                found = {'title': title, 'description': desc}
+                if href is None or any(found.get(key) is None for key in self.required):
+                    continue
+
+                project = {
+                    'title': ops.text(title),
+                    'link': urljoin(base_url, href),
+                    'description': ops.text(desc) if desc is not None else '',
+                }
+                if price_sels:
+                    price = ops.first(item, price_sels)
+                    project['price'] = ops.text(price) if price is not None else self.default_price
+                projects.append(project)
+            except Exception as e:
+                self.logger.error(f"Ошибка обработки проекта: {e}")
+        return projects
+
+
+class _Ops:
+    """Доступ к дереву конкретного бэкенда"""
+
+    def __init__(self, select, select_one, text, attr):
+        self.select = select
+        self._select_one = select_one
+        self.text = text
+        self.attr = attr
+
+    def first(self, node: Any, patterns: Sequence) -> Any:
+        for pattern in patterns:
+            found = self._select_one(node, pattern)
+            if found is not None:
+                return found
+        return None
+
+
+_SOUP = _Ops(
+    select=lambda node, pattern: pattern.select(node),
+    select_one=lambda node, pattern: pattern.select_one(node),
+    text=lambda node: node.get_text().strip(),
+    attr=lambda node, name: node.get(name),
+)
+
+_LEXBOR = _Ops(
+    select=lambda node, selector: node.css(selector),
+    select_one=lambda node, selector: node.css_first(selector),
+    text=lambda node: node.text(deep=True).strip(),
+    attr=lambda node, name: node.attributes.get(name),
+)
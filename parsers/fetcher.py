@@ -0,0 +1,150 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Any
+import aiohttp
+from multidict import CIMultiDict
+from utils.rate_limit import AdaptiveRateLimiter, get_rate_limiter
+from .headers import next_headers
+from config import (
+    HTTP_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_LIMIT,
+    HTTP_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_DNS_CACHE_TTL,
+    HTTP_VERIFY_SSL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class FetchResponse:
+    """Результат HTTP-запроса, прочитанный до закрытия соединения"""
+
+    def __init__(self, url: str, status: int, text: str, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.status = status
+        self.text = text
+        self.headers = CIMultiDict(headers or {})
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class HttpFetcher:
+    """Долгоживущий пул HTTP-соединений, общий для всех парсеров.
+
+    Сессия создается лениво внутри работающего цикла событий и переиспользуется
+    между проверками сайтов, поэтому повторные запросы к тому же хосту
+    идут по уже открытым keep-alive соединениям.
+    """
+
+    def __init__(
+        self,
+        proxy: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = HTTP_TIMEOUT,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        limit: int = HTTP_LIMIT,
+        limit_per_host: int = HTTP_LIMIT_PER_HOST,
+        limiter: Optional[AdaptiveRateLimiter] = None,
+    ) -> None:
+        self.proxy = proxy
+        self.limiter = limiter or get_rate_limiter()
+        # Без явных заголовков сессия получает один профиль браузера из общего пула
+        self.headers = dict(headers) if headers else next_headers()
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._session = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _create_connector(self):
+        options = dict(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+            ssl=None if HTTP_VERIFY_SSL else False,
+        )
+        if self.proxy and self.proxy.startswith('socks'):
+            from aiohttp_socks import ProxyConnector
+            return ProxyConnector.from_url(self.proxy, **options)
+        return aiohttp.TCPConnector(**options)
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Возвращает открытую сессию, создавая её при первом обращении"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            # Сессия привязана к циклу событий: после asyncio.run() в
+            # синхронных обертках старый цикл закрыт, поэтому создаем новую.
+            await self._drop_session()
+            self._session = aiohttp.ClientSession(
+                connector=self._create_connector(),
+                timeout=self.timeout,
+                headers=self.headers,
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+                trust_env=True,
+            )
+            self._loop = loop
+        return self._session
+
+    async def _drop_session(self) -> None:
+        """Закрывает сессию прежнего цикла событий, чтобы не оставлять открытые соединения"""
+        session, self._session = self._session, None
+        if session is None or session.closed:
+            return
+        if self._loop is None or not self._loop.is_closed():
+            await session.close()
+            return
+        # Цикл уже закрыт: корректно закрыть его соединения нельзя, поэтому
+        # отцепляем пул от сессии и закрываем сокеты без ожидания
+        connector = session.connector
+        session.detach()
+        if connector is not None:
+            try:
+                await connector.close()
+            except RuntimeError:
+                pass
+
+    async def fetch(self, url: str, **kwargs: Any) -> FetchResponse:
+        """Выполняет GET-запрос и возвращает прочитанный ответ.
+
+        Перед запросом ждет свободный слот у ограничителя частоты для хоста,
+        после ответа сообщает ему статус и заголовок Retry-After.
+        """
+        session = await self.get_session()
+        if self.proxy and not self.proxy.startswith('socks'):
+            kwargs.setdefault('proxy', self.proxy)
+        await self.limiter.acquire(url)
+        async with session.get(url, **kwargs) as response:
+            text = await response.text()
+            self.limiter.record(url, response.status, response.headers.get('Retry-After'))
+            return FetchResponse(url, response.status, text, response.headers)
+
+    async def close(self) -> None:
+        """Закрывает сессию и все соединения пула"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+_fetcher: Optional[HttpFetcher] = None
+
+
+def get_fetcher() -> HttpFetcher:
+    """Возвращает общий для процесса HTTP-клиент"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = HttpFetcher()
+    return _fetcher
+
+
+async def close_fetcher() -> None:
+    """Закрывает общий HTTP-клиент при остановке приложения"""
+    global _fetcher
+    if _fetcher is not None:
+        await _fetcher.close()
+        _fetcher = None
@@ -0,0 +1,63 @@
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import HEADERS, HEADER_PROFILES_FILE
+
+logger = logging.getLogger(__name__)
+
+
+class HeaderPool:
+    """Пул согласованных наборов заголовков браузеров.
+
+    Каждый профиль — заголовки одного браузера целиком (User-Agent,
+    Accept-Language, Sec-Ch-Ua и т.д. не смешиваются между браузерами).
+    Профили выдаются по очереди с учетом веса (плавный взвешенный round-robin),
+    без случайных чисел и сетевых запросов.
+    """
+
+    def __init__(self, profiles: List[Tuple[str, Dict[str, str], int]]):
+        if not profiles:
+            raise ValueError("Пул заголовков пуст")
+        self.profiles = [(name, headers, max(int(weight), 1)) for name, headers, weight in profiles]
+        self._current = [0] * len(self.profiles)
+        self._total = sum(weight for _, _, weight in self.profiles)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "HeaderPool":
+        """Читает профили из JSON-файла; config.HEADERS всегда входит в пул первым"""
+        profiles: List[Tuple[str, Dict[str, str], int]] = [("default", HEADERS, 1)]
+        path = Path(path or HEADER_PROFILES_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                for item in json.load(f):
+                    profiles.append((item["name"], dict(item["headers"]), item.get("weight", 1)))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Не удалось прочитать профили заголовков из {path}: {e}")
+        return cls(profiles)
+
+    def next(self) -> Dict[str, str]:
+        """Возвращает копию следующего профиля: вызывающий может дополнять заголовки"""
+        best = 0
+        for i, (_, _, weight) in enumerate(self.profiles):
+            self._current[i] += weight
+            if self._current[i] > self._current[best]:
+                best = i
+        self._current[best] -= self._total
+        return dict(self.profiles[best][1])
+
+
+_pool: Optional[HeaderPool] = None
+
+
+def get_header_pool() -> HeaderPool:
+    """Возвращает общий для всех парсеров пул, загружая файл при первом обращении"""
+    global _pool
+    if _pool is None:
+        _pool = HeaderPool.load()
+    return _pool
+
+
+def next_headers() -> Dict[str, str]:
+    return get_header_pool().next()
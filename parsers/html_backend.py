@@ -0,0 +1,72 @@
+import logging
+import re
+from typing import Any, Optional, Sequence, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
+from config import HTML_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Описание контейнера карточки для предварительной фильтрации: (тег, CSS-класс)
+CardFilter = Tuple[Optional[str], Optional[str]]
+
+BACKENDS = ('lxml', 'html.parser', 'selectolax')
+
+try:
+    import lxml  # noqa: F401
+    _HAS_LXML = True
+except ImportError:  # pragma: no cover - lxml указан в requirements.txt
+    _HAS_LXML = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    """Возвращает доступный бэкенд, откатываясь на более медленный при нехватке пакетов"""
+    backend = backend or HTML_BACKEND
+    if backend == 'selectolax' and LexborHTMLParser is None:
+        logger.warning("selectolax не установлен, использую lxml")
+        backend = 'lxml'
+    if backend == 'lxml' and not _HAS_LXML:
+        backend = 'html.parser'
+    if backend not in BACKENDS:
+        logger.warning(f"Неизвестный HTML_BACKEND={backend}, использую html.parser")
+        backend = 'html.parser'
+    return backend
+
+
+def _strainer(cards: Sequence[CardFilter]) -> SoupStrainer:
+    # При фильтрации атрибут class еще не разбит на список значений,
+    # поэтому ищем класс как отдельное слово в строке
+    filters = [
+        (tag, re.compile(rf'(?:^|\s){re.escape(css_class)}(?:\s|$)') if css_class else None)
+        for tag, css_class in cards
+    ]
+
+    def match(name: str, attrs: Any) -> bool:
+        classes = attrs.get('class') or ''
+        if not isinstance(classes, str):
+            classes = ' '.join(classes)
+        return any(
+            (tag is None or tag == name) and (token is None or token.search(classes))
+            for tag, token in filters
+        )
+
+    return SoupStrainer(match)
+
+
+def make_soup(html: str, cards: Sequence[CardFilter] = (), backend: Optional[str] = None) -> Any:
+    """Разбирает HTML выбранным бэкендом и возвращает корень дерева.
+
+    Если заданы ``cards``, бэкенды на BeautifulSoup строят дерево только из
+    контейнеров карточек (SoupStrainer), пропуская шапку, меню и скрипты.
+    selectolax разбирает документ целиком: его C-парсер быстрее фильтрации.
+    Для selectolax возвращается ``LexborHTMLParser``, иначе ``BeautifulSoup``.
+    """
+    backend = resolve_backend(backend)
+    if backend == 'selectolax':
+        return LexborHTMLParser(html)
+    parse_only = _strainer(cards) if cards else None
+    return BeautifulSoup(html, backend, parse_only=parse_only)
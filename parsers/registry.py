@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import importlib
+import logging
+import sys
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from config import ENABLED_PARSERS
+
+if TYPE_CHECKING:
+    # Только для аннотаций: base_parser тянет aiohttp и HTML-парсеры
+    from .base_parser import BaseParser
+
+logger = logging.getLogger(__name__)
+
+# Имя парсера -> (модуль, класс). Модуль импортируется только при первом
+# обращении к включенному парсеру
+PARSERS: Dict[str, Tuple[str, str]] = {
+    "FreelanceRu": ("parsers.freelance_ru", "FreelanceRuParser"),
+    "FLRu": ("parsers.fl_ru", "FLRuParser"),
+    "KworkRu": ("parsers.kwork_ru", "KworkRuParser"),
+    "Upwork": ("parsers.upwork", "UpworkParser"),
+}
+
+_instances: Dict[str, BaseParser] = {}
+
+
+def enabled_parsers() -> List[str]:
+    """Возвращает имена включенных парсеров (переменная PARSERS) без импорта их модулей"""
+    names = []
+    for name in ENABLED_PARSERS:
+        if name not in PARSERS:
+            logger.warning(f"Неизвестный парсер {name}, доступны: {', '.join(PARSERS)}")
+        elif name not in names:
+            names.append(name)
+    return names
+
+
+def get_parser(name: str) -> BaseParser:
+    """Импортирует модуль парсера и создает его при первом обращении.
+
+    Экземпляр создается один раз: все парсеры используют общий пул HTTP-соединений.
+    """
+    parser = _instances.get(name)
+    if parser is None:
+        module_name, class_name = PARSERS[name]
+        parser_class = getattr(importlib.import_module(module_name), class_name)
+        parser = _instances[name] = parser_class()
+    return parser
+
+
+async def close() -> None:
+    """Закрывает общий HTTP-клиент и пул разбора HTML, если парсеры запускались.
+
+    Модули, которые не импортировались, не загружаются ради остановки.
+    """
+    fetcher = sys.modules.get(f"{__package__}.fetcher")
+    if fetcher is not None:
+        await fetcher.close_fetcher()
+    base_parser = sys.modules.get(f"{__package__}.base_parser")
+    if base_parser is not None:
+        base_parser.shutdown_parse_executor()
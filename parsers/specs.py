@@ -0,0 +1,42 @@
+from typing import Dict, List, Optional
+from .extract import ListingSpec
+
+# Описания карточек заказов по площадкам (ключ — имя парсера).
+# Для новой площадки с HTML-выдачей достаточно добавить сюда запись.
+SPECS: Dict[str, ListingSpec] = {spec.name: spec for spec in (
+    ListingSpec(
+        'FL.ru',
+        cards=('.b-post', 'div.project-card'),
+        title='.b-post__link',
+        description='.b-post__txt',
+        price='.b-post__price',
+        required=('title', 'description'),
+    ),
+    ListingSpec(
+        'Kwork.ru',
+        cards='.card',
+        title=('.card__title a', 'a[data-test-id="order-card-title"]'),
+        description=('.card__description', '[data-test-id="order-card-description"]'),
+        price=('.card__price', '[data-test-id="order-card-price"]'),
+    ),
+    ListingSpec(
+        'Freelance.ru',
+        cards=('div.proj', 'div.project', 'article.project-card'),
+        title=('.ptitle a', 'h2 a'),
+        description=('.ptxt', 'div[class*="description"]'),
+        required=('title', 'description'),
+    ),
+    ListingSpec(
+        'Upwork',
+        cards='section.up-card-section',
+        title=('a.job-title-link', 'a'),
+        description='p',
+        price='.amount',
+        required=('title', 'description'),
+    ),
+)}
+
+
+def extract_listing(source: str, html: str, base_url: str, backend: Optional[str] = None) -> List[Dict]:
+    """Разбирает страницу выдачи площадки ``source`` (может выполняться в процессе-обработчике)"""
+    return SPECS[source].extract(html, base_url, backend)
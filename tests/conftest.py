@@ -12,6 +12,11 @@ if ROOT_DIR not in sys.path:
 # Provide dummy env vars so importing `config` does not fail
 os.environ.setdefault("TELEGRAM_TOKEN", "dummy")
 os.environ.setdefault("TELEGRAM_CHAT_ID", "dummy")
+# Parse HTML in-process unless a test starts its own pool
+os.environ.setdefault("PARSE_WORKERS", "0")
+# Do not throttle test notifications to Telegram's real per-chat limit
+os.environ.setdefault("TELEGRAM_RATE_PER_CHAT", "1000")
+os.environ.setdefault("TELEGRAM_RATE_GLOBAL", "1000")
 
 # Provide a stub for `dotenv` if the package is missing
 try:
@@ -23,19 +28,6 @@ except ModuleNotFoundError:  # pragma: no cover
         return None
     dotenv.load_dotenv = load_dotenv
 
-# Stub `requests` if missing
-try:
-    import requests  # type: ignore
-except ModuleNotFoundError:  # pragma: no cover
-    requests = types.ModuleType("requests")
-    sys.modules["requests"] = requests
-    class HTTPError(Exception):
-        pass
-    requests.HTTPError = HTTPError
-    def _not_implemented(*a, **k):
-        raise RuntimeError("network disabled")
-    requests.get = _not_implemented
-
 # Stub `telegram` if missing
 try:
     import telegram  # type: ignore
@@ -172,11 +164,11 @@ except ModuleNotFoundError:  # pragma: no cover
     asyncio_sched.AsyncIOScheduler = AsyncIOScheduler
     cron.CronTrigger = CronTrigger
 
-# Minimal implementation of BeautifulSoup for our tests
+# Minimal implementation of BeautifulSoup for our tests if bs4 is missing
 try:
-    from bs4 import BeautifulSoup  # type: ignore
+    import bs4  # type: ignore
 except ModuleNotFoundError:  # pragma: no cover
-    pass
+    bs4 = None
 
 def _find_by_classes(element, classes):
     results = []
@@ -227,7 +219,7 @@ class _FakeTag:
         return self._el.attrib[item]
 
 class BeautifulSoup:  # type: ignore
-    def __init__(self, html, parser='html.parser'):
+    def __init__(self, html, parser='html.parser', parse_only=None):
         self._root = ET.fromstring(f"<root>{html}</root>")
     def select(self, selector):
         tokens = selector.split()
@@ -239,13 +231,20 @@ class BeautifulSoup:  # type: ignore
         res = self.select(selector)
         return res[0] if res else None
 
-sys.modules['bs4'] = types.ModuleType('bs4')
-sys.modules['bs4'].BeautifulSoup = BeautifulSoup
+class SoupStrainer:  # type: ignore
+    def __init__(self, *a, **k):
+        pass
+
+if bs4 is None:  # pragma: no cover
+    sys.modules['bs4'] = types.ModuleType('bs4')
+    sys.modules['bs4'].BeautifulSoup = BeautifulSoup
+    sys.modules['bs4'].SoupStrainer = SoupStrainer
 
 class _DummyResponse:
     def __init__(self, text: str = "", status: int = 200):
         self.status = status
         self._text = text
+        self.headers = {}
     async def text(self) -> str:
         return self._text
     def raise_for_status(self) -> None:
@@ -256,8 +255,12 @@ class _DummyResponse:
         pass
 
 class _DummySession:
+    closed = False
+
     def __init__(self, text: str = ""):
         self._text = text
+    async def close(self):
+        self.closed = True
     async def __aenter__(self):
         return self
     async def __aexit__(self, exc_type, exc, tb):
@@ -265,8 +268,31 @@ class _DummySession:
     def get(self, *args, **kwargs):
         return _DummyResponse(self._text)
 
+class FakeFetcher:
+    """Отдает заранее заданный HTML вместо сетевого запроса"""
+
+    def __init__(self, html: str, status: int = 200):
+        self.html = html
+        self.status = status
+        self.urls = []
+
+    async def fetch(self, url, **kwargs):
+        from parsers.fetcher import FetchResponse
+        self.urls.append(url)
+        return FetchResponse(url, self.status, self.html)
+
 # Patch aiohttp.ClientSession globally to prevent real HTTP calls
 @pytest.fixture(autouse=True)
 def _patch_aiohttp(monkeypatch):
     monkeypatch.setattr(aiohttp, "ClientSession", lambda *a, **k: _DummySession(), raising=False)
     yield
+
+
+# Each test gets its own SQLite file so cached HTTP validators and sent links
+# from one test never leak into another
+@pytest.fixture(autouse=True)
+def _isolated_storage(tmp_path):
+    from utils import seen_links, storage
+    storage.init(tmp_path / "storage.db")
+    yield
+    seen_links.close()
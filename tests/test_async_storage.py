@@ -0,0 +1,39 @@
+import asyncio
+import threading
+import time
+
+from utils import async_storage, storage
+
+
+def test_calls_run_on_storage_thread():
+    async def run():
+        return await async_storage.run(threading.current_thread)
+
+    thread = asyncio.run(run())
+    assert thread is not threading.current_thread()
+    assert thread.name.startswith('storage')
+
+
+def test_slow_storage_does_not_block_loop():
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(async_storage.run(time.sleep, 0.2), ticker())
+
+    asyncio.run(run())
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.15
+
+
+def test_writes_visible_to_sync_calls():
+    async def run():
+        await async_storage.save_crawl_mark('FL.ru', ['https://www.fl.ru/projects/1/'])
+        return await async_storage.load_crawl_mark('FL.ru')
+
+    assert asyncio.run(run()) == ['https://www.fl.ru/projects/1/']
+    assert storage.load_crawl_mark('FL.ru') == ['https://www.fl.ru/projects/1/']
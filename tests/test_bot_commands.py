@@ -1,5 +1,5 @@
 import asyncio
-from utils import keywords
+from utils import keywords, storage
 from utils import telegram_bot
 
 class DummyMessage:
@@ -7,7 +7,7 @@ class DummyMessage:
         self.texts = []
         self.markups = []
 
-    async def reply_text(self, text, reply_markup=None):
+    async def reply_text(self, text, reply_markup=None, **kwargs):
         self.texts.append(text)
         self.markups.append(reply_markup)
 
@@ -33,7 +33,7 @@ class DummyContext:
 
 def test_keyword_commands(tmp_path):
     keywords.storage.init(tmp_path / 'db.sqlite')
-    keywords.KEYWORDS.clear()
+    keywords.set_keywords([])
     async def run():
         upd = DummyUpdate()
         await telegram_bot.addkeyword_cmd(upd, DummyContext(['python']))
@@ -48,7 +48,7 @@ def test_keyword_commands(tmp_path):
         await telegram_bot.removekeyword_cmd(upd_rm, DummyContext(['python']))
         assert 'python' not in keywords.KEYWORDS
         assert 'python' not in keywords.storage.load_keywords(True)
-        keywords.KEYWORDS[:] = keywords.DEFAULT_KEYWORDS[:]
+        keywords.set_keywords(keywords.DEFAULT_KEYWORDS)
         keywords.storage.init('sent_links.db')
     asyncio.run(run())
 
@@ -68,3 +68,47 @@ def test_start_cmd(tmp_path):
         keywords.storage.init('sent_links.db')
 
     asyncio.run(run())
+
+
+def test_search_cmd(tmp_path):
+    storage.init(tmp_path / 'db.sqlite')
+    storage.archive_projects([
+        {'title': 'Верстка лендинга', 'link': 'https://kwork.ru/projects/1',
+         'description': 'Нужен <b>адаптив</b>', 'price': '5000 ₽'},
+        {'title': 'Написать бота', 'link': 'https://kwork.ru/projects/2', 'description': 'Python'},
+    ], 'Kwork.ru')
+
+    async def run():
+        upd = DummyUpdate()
+        await telegram_bot.search_cmd(upd, DummyContext(['верст']))
+        assert 'Верстка лендинга' in upd.message.texts[0]
+        assert 'Kwork.ru · 5000 ₽' in upd.message.texts[0]
+        assert 'бота' not in upd.message.texts[0]
+
+        upd_empty = DummyUpdate()
+        await telegram_bot.search_cmd(upd_empty, DummyContext(['"AND(']))
+        assert upd_empty.message.texts[0].startswith('Nothing found')
+
+        upd_usage = DummyUpdate()
+        await telegram_bot.search_cmd(upd_usage, DummyContext([]))
+        assert upd_usage.message.texts[0].startswith('Usage')
+
+    asyncio.run(run())
+
+
+def test_search_cmd_fits_message_limit(tmp_path):
+    storage.init(tmp_path / 'db.sqlite')
+    storage.archive_projects([
+        {'title': 'Сайт ' + 'очень длинный заголовок ' * 100,
+         'link': f'https://kwork.ru/projects/{i}?' + 'x' * 500, 'description': ''}
+        for i in range(telegram_bot.SEARCH_LIMIT)
+    ], 'Kwork.ru')
+
+    async def run():
+        upd = DummyUpdate()
+        await telegram_bot.search_cmd(upd, DummyContext(['сайт']))
+        text = upd.message.texts[0]
+        assert len(text) <= telegram_bot.MESSAGE_LIMIT
+        assert '…' in text
+
+    asyncio.run(run())
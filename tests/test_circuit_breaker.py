@@ -0,0 +1,55 @@
+import asyncio
+
+from utils import storage
+from utils.circuit_breaker import CircuitBreaker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_probes_and_closes():
+    clock = _Clock()
+    breaker = CircuitBreaker(threshold=2, cooldown=60, clock=clock)
+
+    async def run():
+        assert await breaker.allow('FL.ru')
+        await breaker.record_failure('FL.ru')
+        assert await breaker.allow('FL.ru')
+        await breaker.record_failure('FL.ru')
+        assert not await breaker.allow('FL.ru')
+
+        # После паузы пропускается одна пробная проверка
+        clock.now += 61
+        assert await breaker.allow('FL.ru')
+        assert not await breaker.allow('FL.ru')
+        await breaker.record_failure('FL.ru')
+        assert not await breaker.allow('FL.ru')
+
+        clock.now += 61
+        assert await breaker.allow('FL.ru')
+        await breaker.record_success('FL.ru')
+        assert await breaker.allow('FL.ru')
+        assert await breaker.allow('FL.ru')
+
+    asyncio.run(run())
+    assert storage.load_source_health('FL.ru') == (0, 0.0)
+
+
+def test_breaker_state_survives_restart():
+    clock = _Clock()
+
+    async def fail_twice():
+        breaker = CircuitBreaker(threshold=2, cooldown=60, clock=clock)
+        await breaker.record_failure('Upwork')
+        await breaker.record_failure('Upwork')
+
+    asyncio.run(fail_twice())
+    # Новый экземпляр (перезапуск бота) читает состояние из базы
+    restarted = CircuitBreaker(threshold=2, cooldown=60, clock=clock)
+    assert not asyncio.run(restarted.allow('Upwork'))
+    assert asyncio.run(restarted.allow('Kwork.ru'))
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from parsers.fetcher import FetchResponse
+from parsers.fl_ru import FLRuParser
+from utils import keywords, storage
+
+HTML = (
+    '<div class="b-post">\n'
+    '  <a class="b-post__link" href="/p1">Создать сайт</a>\n'
+    '  <div class="b-post__txt">Описание</div>\n'
+    '</div>'
+)
+
+
+class _ValidatingFetcher:
+    """Имитирует сервер, поддерживающий ETag"""
+
+    def __init__(self, html: str, etag: str = '"v1"', honour_etag: bool = True):
+        self.html = html
+        self.etag = etag
+        self.honour_etag = honour_etag
+        self.requests = []
+
+    async def fetch(self, url, **kwargs):
+        headers = kwargs.get('headers') or {}
+        self.requests.append(headers)
+        if self.honour_etag and headers.get('If-None-Match') == self.etag:
+            return FetchResponse(url, 304, '')
+        return FetchResponse(url, 200, self.html, {'etag': self.etag})
+
+
+def test_not_modified_skips_parsing(tmp_path):
+    storage.init(tmp_path / 'cache.db')
+    fetcher = _ValidatingFetcher(HTML)
+    parser = FLRuParser(fetcher=fetcher)
+
+    assert len(asyncio.run(parser.async_find_projects())) == 1
+    assert asyncio.run(parser.async_find_projects()) == []
+    assert fetcher.requests[1]['If-None-Match'] == '"v1"'
+
+
+def test_identical_body_skips_parsing(tmp_path):
+    storage.init(tmp_path / 'cache.db')
+    parser = FLRuParser(fetcher=_ValidatingFetcher(HTML, honour_etag=False))
+
+    assert len(asyncio.run(parser.async_find_projects())) == 1
+    assert asyncio.run(parser.async_find_projects()) == []
+
+    parser.fetcher = _ValidatingFetcher(HTML.replace('/p1', '/p2'), honour_etag=False)
+    assert len(asyncio.run(parser.async_find_projects())) == 1
+
+
+def test_keyword_change_invalidates_cache(tmp_path):
+    storage.init(tmp_path / 'cache.db')
+    fetcher = _ValidatingFetcher(HTML)
+    parser = FLRuParser(fetcher=fetcher)
+    asyncio.run(parser.async_find_projects())
+
+    original = keywords.KEYWORDS
+    keywords.set_keywords(original + ['новое'])
+    try:
+        assert len(asyncio.run(parser.async_find_projects())) == 1
+        assert 'If-None-Match' not in fetcher.requests[1]
+    finally:
+        keywords.set_keywords(original)
+
+
+def test_failed_crawl_does_not_cache_page(tmp_path):
+    storage.init(tmp_path / 'cache.db')
+    fetcher = _ValidatingFetcher(HTML)
+    parser = FLRuParser(fetcher=fetcher)
+    parse = parser._async_parse_response
+
+    async def broken(html):
+        raise RuntimeError('parse failed')
+
+    parser._async_parse_response = broken
+    with pytest.raises(RuntimeError):
+        asyncio.run(parser.async_find_projects())
+    # Страница не была обработана: ETag не сохранен, заказы не потеряны
+    parser._async_parse_response = parse
+    assert len(asyncio.run(parser.async_find_projects())) == 1
+    assert 'If-None-Match' not in fetcher.requests[1]
@@ -0,0 +1,72 @@
+import asyncio
+
+from parsers.fetcher import FetchResponse
+from parsers.fl_ru import FLRuParser
+from utils import storage
+
+
+def _page(ids):
+    return ''.join(
+        '<div class="b-post">'
+        f'<a class="b-post__link" href="/projects/{i}/">Сайт {i}</a>'
+        '<div class="b-post__txt">Описание</div>'
+        '</div>'
+        for i in ids
+    )
+
+
+class _PagedFetcher:
+    """Выдача FL.ru по 4 заказа на странице, новые сверху"""
+
+    def __init__(self, newest: int):
+        self.newest = newest
+        self.urls = []
+
+    async def fetch(self, url, **kwargs):
+        self.urls.append(url)
+        page = 1
+        if 'page-' in url:
+            page = int(url.rstrip('/').rsplit('page-', 1)[1])
+        top = self.newest - (page - 1) * 4
+        ids = [i for i in range(top, top - 4, -1) if i > 0]
+        return FetchResponse(url, 200, _page(ids))
+
+
+def test_crawl_stops_at_previous_mark():
+    fetcher = _PagedFetcher(newest=8)
+    parser = FLRuParser(fetcher=fetcher)
+
+    # Первый запуск: метки нет, читаем только первую страницу
+    first = asyncio.run(parser.async_find_projects())
+    assert [p['title'] for p in first] == ['Сайт 8', 'Сайт 7', 'Сайт 6', 'Сайт 5']
+    assert len(fetcher.urls) == 1
+
+    # За время между проверками появилось 6 заказов: нужна вторая страница
+    fetcher.newest = 14
+    fetcher.urls.clear()
+    second = asyncio.run(parser.async_find_projects())
+    assert [p['title'] for p in second][:6] == [f'Сайт {i}' for i in range(14, 8, -1)]
+    assert fetcher.urls == ['https://www.fl.ru/projects/', 'https://www.fl.ru/projects/page-2/']
+    assert storage.load_crawl_mark('FL.ru')[0] == 'https://www.fl.ru/projects/14/'
+
+
+def test_crawl_respects_page_limit():
+    fetcher = _PagedFetcher(newest=8)
+    parser = FLRuParser(fetcher=fetcher)
+    parser.max_pages = 2
+    asyncio.run(parser.async_find_projects())
+
+    fetcher.newest = 100
+    fetcher.urls.clear()
+    asyncio.run(parser.async_find_projects())
+    assert len(fetcher.urls) == 2
+
+
+def test_crawled_projects_are_archived():
+    parser = FLRuParser(fetcher=_PagedFetcher(newest=4))
+    asyncio.run(parser.async_find_projects())
+
+    # В архиве все карточки страницы, включая не прошедшие фильтр
+    found = storage.search_projects('сайт 3')
+    assert [p['link'] for p in found] == ['https://www.fl.ru/projects/3/']
+    assert found[0]['source'] == 'FL.ru'
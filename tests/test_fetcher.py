@@ -0,0 +1,78 @@
+import asyncio
+import gc
+
+import aiohttp
+
+from parsers.fetcher import HttpFetcher, get_fetcher
+from parsers.fl_ru import FLRuParser
+from parsers.kwork_ru import KworkRuParser
+
+# conftest подменяет ClientSession заглушкой; настоящая нужна для проверки закрытия
+_ClientSession = aiohttp.ClientSession
+
+
+class _Session:
+    closed = False
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    @property
+    def connector(self):
+        return self.kwargs.get('connector')
+
+    def detach(self):
+        self.closed = True
+
+    async def close(self):
+        self.closed = True
+
+
+def test_session_is_reused(monkeypatch):
+    created = []
+
+    def factory(**kwargs):
+        created.append(_Session(**kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(aiohttp, 'ClientSession', factory, raising=False)
+    fetcher = HttpFetcher(limit_per_host=2)
+
+    async def run():
+        first = await fetcher.get_session()
+        second = await fetcher.get_session()
+        assert first is second
+        connector = first.kwargs['connector']
+        assert connector.limit_per_host == 2
+        await fetcher.close()
+        assert first.closed
+
+    asyncio.run(run())
+    assert len(created) == 1
+
+
+def test_session_recreated_for_new_loop(monkeypatch):
+    monkeypatch.setattr(aiohttp, 'ClientSession', lambda **k: _Session(**k), raising=False)
+    fetcher = HttpFetcher()
+    first = asyncio.run(fetcher.get_session())
+    second = asyncio.run(fetcher.get_session())
+    assert first is not second
+    assert first.closed and not second.closed
+
+
+def test_previous_loop_session_is_closed_without_warnings(monkeypatch, recwarn):
+    monkeypatch.setattr(aiohttp, 'ClientSession', _ClientSession)
+    fetcher = HttpFetcher()
+    first = asyncio.run(fetcher.get_session())
+    second = asyncio.run(fetcher.get_session())
+    assert first.closed and first.connector is None
+    assert not second.closed
+    asyncio.run(fetcher.close())
+    del first, second
+    gc.collect()
+    assert not [w for w in recwarn if 'Unclosed' in str(w.message)]
+
+
+def test_parsers_share_fetcher():
+    assert FLRuParser().fetcher is get_fetcher()
+    assert KworkRuParser().fetcher is FLRuParser().fetcher
@@ -1,42 +1,11 @@
 import asyncio
 import unittest
-from unittest.mock import patch
-import requests
 
+from conftest import FakeFetcher
 from parsers.fl_ru import FLRuParser
 from parsers.kwork_ru import KworkRuParser
 
 
-class _MockRequestsResponse:
-    def __init__(self, text: str, status_code: int = 200):
-        self.text = text
-        self.status_code = status_code
-    def raise_for_status(self) -> None:
-        if self.status_code != 200:
-            raise requests.HTTPError(f"status {self.status_code}")
-
-
-class _MockAiohttpResponse:
-    def __init__(self, text: str, status: int = 200):
-        self._text = text
-        self.status = status
-    async def text(self) -> str:
-        return self._text
-    async def __aenter__(self):
-        return self
-    async def __aexit__(self, exc_type, exc, tb):
-        pass
-
-def _mock_session_factory(html: str):
-    class _Session:
-        async def __aenter__(self):
-            return self
-        async def __aexit__(self, exc_type, exc, tb):
-            pass
-        def get(self, *args, **kwargs):
-            return _MockAiohttpResponse(html)
-    return _Session()
-
 
 class TestFLRuParser(unittest.TestCase):
     HTML = (
@@ -56,34 +25,32 @@ class TestFLRuParser(unittest.TestCase):
     )
 
     def setUp(self):
-        self.parser = FLRuParser()
+        self.parser = FLRuParser(fetcher=FakeFetcher(self.HTML))
 
-    @patch('parsers.fl_ru.requests.get')
-    def test_find_projects(self, mock_get):
-        mock_get.return_value = _MockRequestsResponse(self.HTML)
+    def test_find_projects(self):
         projects = self.parser.find_projects()
         self.assertEqual(len(projects), 1)
         self.assertEqual(projects[0]['title'], 'Создать сайт')
+        self.assertEqual(projects[0]['keywords'], ['сайт'])
 
-    @patch('parsers.fl_ru.requests.get')
-    def test_find_projects_no_keywords(self, mock_get):
-        mock_get.return_value = _MockRequestsResponse(self.HTML_NO_KEYWORDS)
+    def test_find_projects_no_keywords(self):
+        self.parser.fetcher = FakeFetcher(self.HTML_NO_KEYWORDS)
         projects = self.parser.find_projects()
         self.assertEqual(projects, [])
 
     def test_async_find_projects(self):
         async def run():
-            with patch('aiohttp.ClientSession', return_value=_mock_session_factory(self.HTML)):
-                projects = await self.parser.async_find_projects()
-                self.assertEqual(len(projects), 1)
-                self.assertEqual(projects[0]['title'], 'Создать сайт')
+            projects = await self.parser.async_find_projects()
+            self.assertEqual(len(projects), 1)
+            self.assertEqual(projects[0]['title'], 'Создать сайт')
+            self.assertEqual(self.parser.fetcher.urls, [self.parser.search_url])
         asyncio.run(run())
 
     def test_async_find_projects_no_keywords(self):
+        self.parser.fetcher = FakeFetcher(self.HTML_NO_KEYWORDS)
         async def run():
-            with patch('aiohttp.ClientSession', return_value=_mock_session_factory(self.HTML_NO_KEYWORDS)):
-                projects = await self.parser.async_find_projects()
-                self.assertEqual(projects, [])
+            projects = await self.parser.async_find_projects()
+            self.assertEqual(projects, [])
         asyncio.run(run())
 
 
@@ -105,32 +72,28 @@ class TestKworkRuParser(unittest.TestCase):
     )
 
     def setUp(self):
-        self.parser = KworkRuParser()
+        self.parser = KworkRuParser(fetcher=FakeFetcher(self.HTML))
 
-    @patch('parsers.kwork_ru.requests.get')
-    def test_find_projects(self, mock_get):
-        mock_get.return_value = _MockRequestsResponse(self.HTML)
+    def test_find_projects(self):
         projects = self.parser.find_projects()
         self.assertEqual(len(projects), 1)
         self.assertEqual(projects[0]['title'], 'Верстка сайта')
 
-    @patch('parsers.kwork_ru.requests.get')
-    def test_find_projects_no_keywords(self, mock_get):
-        mock_get.return_value = _MockRequestsResponse(self.HTML_NO_KEYWORDS)
+    def test_find_projects_no_keywords(self):
+        self.parser.fetcher = FakeFetcher(self.HTML_NO_KEYWORDS)
         projects = self.parser.find_projects()
         self.assertEqual(projects, [])
 
     def test_async_find_projects(self):
         async def run():
-            with patch('aiohttp.ClientSession', return_value=_mock_session_factory(self.HTML)):
-                projects = await self.parser.async_find_projects()
-                self.assertEqual(len(projects), 1)
-                self.assertEqual(projects[0]['title'], 'Верстка сайта')
+            projects = await self.parser.async_find_projects()
+            self.assertEqual(len(projects), 1)
+            self.assertEqual(projects[0]['title'], 'Верстка сайта')
         asyncio.run(run())
 
     def test_async_find_projects_no_keywords(self):
+        self.parser.fetcher = FakeFetcher(self.HTML_NO_KEYWORDS)
         async def run():
-            with patch('aiohttp.ClientSession', return_value=_mock_session_factory(self.HTML_NO_KEYWORDS)):
-                projects = await self.parser.async_find_projects()
-                self.assertEqual(projects, [])
+            projects = await self.parser.async_find_projects()
+            self.assertEqual(projects, [])
         asyncio.run(run())
@@ -0,0 +1,48 @@
+import json
+from collections import Counter
+
+import config
+from parsers.headers import HeaderPool
+
+
+def _write_profiles(path, profiles):
+    path.write_text(json.dumps(profiles), encoding='utf-8')
+    return path
+
+
+def test_pool_includes_default_headers_and_file_profiles(tmp_path):
+    path = _write_profiles(tmp_path / 'profiles.json', [
+        {'name': 'firefox', 'weight': 2, 'headers': {'User-Agent': 'Firefox'}},
+    ])
+    pool = HeaderPool.load(path)
+    assert [name for name, _, _ in pool.profiles] == ['default', 'firefox']
+    assert pool.profiles[0][1] == config.HEADERS
+
+
+def test_weighted_round_robin_is_smooth(tmp_path):
+    pool = HeaderPool([('a', {'User-Agent': 'A'}, 3), ('b', {'User-Agent': 'B'}, 1)])
+    agents = [pool.next()['User-Agent'] for _ in range(8)]
+    assert Counter(agents) == {'A': 6, 'B': 2}
+    # Один профиль не выдается длинной серией подряд
+    assert 'AAAA' not in ''.join(agents)
+
+
+def test_next_returns_a_copy(tmp_path):
+    pool = HeaderPool([('a', {'User-Agent': 'A'}, 1)])
+    pool.next()['X-Token'] = 'secret'
+    assert 'X-Token' not in pool.next()
+
+
+def test_missing_file_falls_back_to_default(tmp_path):
+    pool = HeaderPool.load(tmp_path / 'missing.json')
+    assert pool.next() == config.HEADERS
+
+
+def test_bundled_profiles_are_consistent():
+    pool = HeaderPool.load()
+    assert len(pool.profiles) > 1
+    for name, headers, _ in pool.profiles:
+        assert headers['User-Agent']
+        # Client hints отправляет только Chrome
+        if 'Sec-Ch-Ua' in headers:
+            assert 'Chrome/' in headers['User-Agent']
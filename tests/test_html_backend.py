@@ -0,0 +1,73 @@
+import pytest
+
+from parsers.extract import ListingSpec, card_filters
+from parsers.html_backend import make_soup, resolve_backend
+from parsers.specs import SPECS, extract_listing
+
+pytest.importorskip('lxml')
+
+NOISE = '<ul class="menu"><li><a href="/about">Card о нас</a></li></ul><script>var card = 1;</script>'
+
+PAGES = [
+    ('FL.ru', 'https://www.fl.ru',
+     '<div class="b-post"><a class="b-post__link" href="/p1">Создать сайт</a>'
+     '<div class="b-post__txt">Описание</div><span class="b-post__price">1000</span></div>'),
+    ('Kwork.ru', 'https://kwork.ru',
+     '<div class="card card--order"><div class="card__title"><a href="/k1">Верстка сайта</a></div>'
+     '<div class="card__description">Описание</div><span class="card__price">1000 Р</span></div>'),
+    ('Freelance.ru', 'https://freelance.ru',
+     '<div class="proj"><div class="ptitle"><a href="/project/1.html">Лендинг</a></div>'
+     '<div class="ptxt">Описание</div></div>'),
+    ('Upwork', 'https://www.upwork.com',
+     '<section class="up-card-section"><a class="job-title-link" href="/job/~01">Website</a>'
+     '<p>Description</p><span class="amount">$100</span></section>'),
+]
+
+
+@pytest.mark.parametrize('source, base_url, cards', PAGES, ids=[p[0] for p in PAGES])
+@pytest.mark.parametrize('backend', ['lxml', 'selectolax'])
+def test_backends_match_html_parser(source, base_url, cards, backend):
+    if backend == 'selectolax':
+        pytest.importorskip('selectolax')
+    html = f'<html><body>{NOISE}{cards}{NOISE}</body></html>'
+    expected = extract_listing(source, html, base_url, 'html.parser')
+    assert len(expected) == 1
+    assert extract_listing(source, html, base_url, backend) == expected
+
+
+def test_strainer_keeps_only_cards():
+    html = f'<html><body>{NOISE}<div class="card card--order"><a href="/k1">x</a></div></body></html>'
+    soup = make_soup(html, SPECS['Kwork.ru'].strainer, 'lxml')
+    assert soup.select('script') == []
+    assert soup.select('.menu') == []
+    assert [a['href'] for a in soup.select('.card a')] == ['/k1']
+
+
+def test_unknown_backend_falls_back():
+    assert resolve_backend('nope') == 'html.parser'
+
+
+def test_card_filters_only_for_simple_selectors():
+    assert card_filters(('div.proj', '.card', 'section')) == (('div', 'proj'), (None, 'card'), ('section', None))
+    assert card_filters(('div.proj', 'div[data-id="x"]')) == ()
+
+
+@pytest.mark.parametrize('backend', ['html.parser', 'selectolax'])
+def test_fallback_selectors(backend):
+    if backend == 'selectolax':
+        pytest.importorskip('selectolax')
+    html = (
+        '<article class="project-card"><h2><a href="/project/7.html">Новый дизайн</a></h2>'
+        '<div class="project-description">Текст</div></article>'
+    )
+    assert extract_listing('Freelance.ru', html, 'https://freelance.ru', backend) == [{
+        'title': 'Новый дизайн',
+        'link': 'https://freelance.ru/project/7.html',
+        'description': 'Текст',
+    }]
+
+
+def test_spec_skips_cards_without_required_fields():
+    spec = ListingSpec('Test', cards='.item', title='a', description='p', required=('title', 'description'))
+    html = '<div class="item"><a href="/1">Есть</a><p>Описание</p></div><div class="item"><a href="/2">Нет</a></div>'
+    assert [p['link'] for p in spec.extract(html, 'https://example.com', 'html.parser')] == ['https://example.com/1']
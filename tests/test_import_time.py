@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# На обычной машине импорт main занимает ~0.3 с; на медленных CI-машинах
+# порог можно поднять переменной окружения
+IMPORT_TIME_BUDGET_US = int(os.getenv('IMPORT_TIME_BUDGET_US', '1000000'))
+# HTTP-клиент и HTML-парсеры нужны только при первой проверке сайта
+HEAVY_MODULES = ('aiohttp', 'bs4', 'soupsieve', 'lxml', 'selectolax',
+                 'parsers.base_parser', 'parsers.fetcher')
+
+
+def _import_main(tmp_path, code="import main"):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=tmp_path,
+                          env=env, capture_output=True, text=True, timeout=60)
+
+
+def _cumulative_us(stderr, module):
+    # Строки вида "import time: self [us] | cumulative | imported package"
+    for line in stderr.splitlines():
+        if line.startswith('import time:'):
+            _, cumulative, name = line.split('|')
+            if name.strip() == module:
+                return int(cumulative)
+    raise AssertionError(f'{module} not found in -X importtime output')
+
+
+def test_import_has_no_side_effects(tmp_path):
+    code = (
+        "import main\n"
+        "from utils import keywords, seen_links, storage\n"
+        "assert storage._conn is None\n"
+        "assert keywords._keywords is None\n"
+        "assert seen_links._index is None\n"
+        "import sys\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    workdir = tmp_path / 'cwd'
+    workdir.mkdir()
+    result = _import_main(workdir, code)
+    assert result.returncode == 0, result.stderr
+    assert os.listdir(workdir) == []
+
+
+def test_import_time_budget(tmp_path):
+    result = _import_main(tmp_path)
+    assert result.returncode == 0, result.stderr
+    assert _cumulative_us(result.stderr, 'main') < IMPORT_TIME_BUDGET_US
+
+
+def test_bootstrap_sets_up_runtime_state(tmp_path, monkeypatch):
+    import main
+    from utils import keywords, seen_links, storage
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setitem(main.LOG_FILES, 'bot', dict(main.LOG_FILES['bot'],
+                                                    filename=str(tmp_path / 'logs' / 'bot.log')))
+    monkeypatch.setattr(storage, 'DB_FILE', tmp_path / 'bot.db')
+    monkeypatch.setattr(keywords, '_keywords', None)
+    monkeypatch.setattr(keywords, '_exclude_words', None)
+    monkeypatch.setattr(main.logger, 'handlers', [])
+
+    timings = main.bootstrap()
+    for handler in main.logger.handlers:
+        handler.close()
+
+    assert set(timings) == {'logging', 'storage', 'keywords', 'sent_links'}
+    assert (tmp_path / 'logs' / 'bot.log').exists()
+    assert (tmp_path / 'bot.db').exists()
+    assert keywords.get_keywords()
+    assert seen_links.get_index().db_path == tmp_path / 'bot.db'
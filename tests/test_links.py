@@ -0,0 +1,30 @@
+import pytest
+
+from utils.links import canonical_link, link_key
+
+
+@pytest.mark.parametrize('a, b', [
+    ('https://www.fl.ru/projects/5123456/sozdat-sajt/', 'http://fl.ru/projects/5123456/?utm_source=tg'),
+    ('https://kwork.ru/projects/2488123', 'https://kwork.ru/projects/2488123/view#offers'),
+    ('https://freelance.ru/project/sdelat-lending-1601234.html', 'https://www.freelance.ru/project/1601234.html?ref=1'),
+    ('https://www.upwork.com/job/~01a2b3c4d5', 'https://www.upwork.com/jobs/Landing-page_~01a2b3c4d5/?referrer=x'),
+    ('https://example.com/order/1/', 'http://www.example.com/order/1?utm=1#top'),
+])
+def test_same_project_same_key(a, b):
+    assert canonical_link(a) == canonical_link(b)
+    assert link_key(a) == link_key(b)
+
+
+def test_project_ids():
+    assert canonical_link('https://www.fl.ru/projects/5123456/sozdat-sajt/') == 'fl.ru:5123456'
+    assert canonical_link('https://www.upwork.com/job/~01A2b') == 'upwork.com:~01a2b'
+
+
+def test_different_projects_differ():
+    assert link_key('https://kwork.ru/projects/1') != link_key('https://kwork.ru/projects/2')
+    assert link_key('https://kwork.ru/projects/1') != link_key('https://fl.ru/projects/1')
+
+
+def test_key_fits_sqlite_integer():
+    key = link_key('https://kwork.ru/projects/1')
+    assert -2 ** 63 <= key < 2 ** 63
@@ -0,0 +1,62 @@
+from utils import keywords
+from utils.matcher import KeywordMatcher
+
+
+def _naive(text, include, exclude):
+    text = text.lower()
+    if any(w in text for w in exclude) or not any(w in text for w in include):
+        return None
+    return sorted(w for w in include if w in text)
+
+
+def test_matches_like_substring_search():
+    include = ['сайт', 'веб', 'web', 'website', 'html', 'ui', 'ux', 'css']
+    exclude = ['seo', 'доработка']
+    matcher = KeywordMatcher(include, exclude)
+    texts = [
+        'Создать сайт-визитку',
+        'Нужен WEBSITE на HTML и CSS',
+        'Доработка сайта',
+        'SEO продвижение веб-сайта',
+        'Написать скрипт',
+        'Bui build',
+    ]
+    for text in texts:
+        result = matcher.match(text)
+        expected = _naive(text, include, exclude)
+        assert (sorted(result) if result else None) == expected, text
+
+
+def test_returns_keywords_in_order_of_appearance():
+    matcher = KeywordMatcher(['css', 'html'])
+    assert matcher.match('HTML, CSS и снова html') == ['html', 'css']
+
+
+def test_overlapping_patterns():
+    matcher = KeywordMatcher(['he', 'she', 'his', 'hers'])
+    assert sorted(matcher.match('ushers')) == ['he', 'hers', 'she']
+
+
+def test_empty_include_matches_nothing():
+    assert KeywordMatcher([], ['seo']).match('любой текст') is None
+
+
+def test_snapshot_rebuilt_only_on_change(tmp_path):
+    original = keywords.KEYWORDS
+    keywords.set_keywords(['сайт'])
+    try:
+        snapshot = keywords.get_matcher()
+        assert keywords.get_matcher() is snapshot
+
+        keywords.add_keyword('лендинг')
+        updated = keywords.get_matcher()
+        assert updated is not snapshot
+        assert updated.version > snapshot.version
+        # Старый снимок не меняется: текущий разбор видит прежний набор слов
+        assert snapshot.include == ('сайт',)
+        assert updated.include == ('сайт', 'лендинг')
+
+        keywords.add_keyword('лендинг')
+        assert keywords.get_matcher() is updated
+    finally:
+        keywords.set_keywords(original)
@@ -1,5 +1,7 @@
 import logging
 import asyncio
+import time
+from utils import storage
 from utils.notifier import notify_user, notify_start, notify_stop
 
 def test_notify_user_escaping(monkeypatch, tmp_path):
@@ -14,16 +16,17 @@ def test_notify_user_escaping(monkeypatch, tmp_path):
     monkeypatch.setattr('telegram.Bot.send_message', mock_send, raising=False)
     # disable logging output
     logging.getLogger('utils.notifier').disabled = True
-    notifier.storage.init(tmp_path / 'links.db')
-    monkeypatch.setattr(notifier, '_sent_links', set(), raising=False)
+    storage.init(tmp_path / 'links.db')
     project = {
         'title': '<b>Title</b>',
         'link': 'http://example.com',
-        'description': '<i>Description</i>'
+        'description': '<i>Description</i>',
+        'keywords': ['<web>'],
     }
     asyncio.run(notify_user(project))
     assert '&lt;b&gt;Title&lt;/b&gt;' in sent['text']
     assert '&lt;i&gt;Description&lt;/i&gt;' in sent['text']
+    assert 'Ключевые слова:</b> &lt;web&gt;' in sent['text']
 
 
 def test_notify_user_duplicate(monkeypatch, tmp_path):
@@ -35,13 +38,12 @@ def test_notify_user_duplicate(monkeypatch, tmp_path):
     import utils.notifier as notifier
     monkeypatch.setattr('telegram.Bot.send_message', mock_send, raising=False)
     logging.getLogger('utils.notifier').disabled = True
-    notifier.storage.init(tmp_path / 'links.db')
-    monkeypatch.setattr(notifier, '_sent_links', set(), raising=False)
+    storage.init(tmp_path / 'links.db')
 
     project = {'title': 't', 'link': 'http://dup', 'description': 'd'}
     asyncio.run(notifier.notify_user(project))
-    # simulate new run by clearing in-memory cache and reloading from DB
-    notifier._sent_links = notifier.storage.load_sent_links()
+    # simulate new run by reopening the seen-link index from disk
+    notifier.seen_links.close()
     asyncio.run(notifier.notify_user(project))
     assert len(sent) == 1
 
@@ -59,3 +61,162 @@ def test_start_stop_notifications(monkeypatch):
 
     assert any('запущен' in t for t in calls)
     assert any('остановлен' in t for t in calls)
+
+
+def test_retry_after_blocks_and_resends(monkeypatch):
+    from telegram.error import RetryAfter
+    import utils.notifier as notifier
+
+    calls = []
+    blocked = []
+
+    async def flaky_send(self, chat_id, text, parse_mode=None, disable_web_page_preview=None):
+        calls.append(text)
+        if len(calls) == 1:
+            raise RetryAfter(0)
+
+    monkeypatch.setattr('telegram.Bot.send_message', flaky_send, raising=False)
+    monkeypatch.setattr(notifier._global_bucket, 'block', blocked.append)
+
+    asyncio.run(notifier._send('chat', 'hello'))
+    assert calls == ['hello', 'hello']
+    assert blocked == [0.0]
+
+
+def test_queue_delivers_each_project_once(monkeypatch):
+    import utils.notifier as notifier
+    from utils.rate_limit import TokenBucket
+
+    sent = []
+
+    async def mock_send(self, chat_id, text, parse_mode=None, disable_web_page_preview=None):
+        sent.append(text)
+
+    monkeypatch.setattr('telegram.Bot.send_message', mock_send, raising=False)
+    logging.getLogger('utils.notifier').disabled = True
+    # 20 сообщений в секунду в чат: 5 сообщений займут не меньше 0.2 с
+    monkeypatch.setattr(notifier, '_chat_buckets', {notifier.TELEGRAM_CHAT_ID: TokenBucket(20)})
+
+    projects = [{'title': f't{i}', 'link': f'https://kwork.ru/projects/{i}', 'description': 'd'} for i in range(5)]
+
+    async def run():
+        notifier.start_workers(3)
+        start = time.monotonic()
+        assert await notifier.enqueue_projects(projects) == 5
+        assert await notifier.enqueue_projects(projects[:2]) == 0
+        await notifier.wait_notifications()
+        elapsed = time.monotonic() - start
+        await notifier.stop_workers()
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    assert len(sent) == 5
+    assert elapsed >= 0.15
+    assert all(storage.has_sent_link(p['link']) for p in projects)
+
+
+def test_build_digest_respects_limit_and_adds_footer_once():
+    import utils.notifier as notifier
+
+    projects = [
+        {'title': f'Заказ {i}', 'link': f'https://kwork.ru/projects/{i}', 'description': 'x' * 1000}
+        for i in range(40)
+    ]
+    messages = notifier.build_digest(projects)
+    assert 1 < len(messages) < 40
+    assert all(len(text) <= notifier.MESSAGE_LIMIT for text, _ in messages)
+    assert sum(len(batch) for _, batch in messages) == 40
+    assert [notifier.FOOTER in text for text, _ in messages] == [False] * (len(messages) - 1) + [True]
+
+
+def test_oversized_project_fits_into_one_message(monkeypatch):
+    import utils.notifier as notifier
+
+    project = {
+        'title': '<b>' * 5000,
+        'link': 'https://kwork.ru/projects/1?' + '&x=1' * 2000,
+        'description': 'текст & ' * 2000,
+        'keywords': ['python'] * 1000,
+    }
+    messages = notifier.build_digest([project])
+    assert len(messages) == 1
+    assert len(messages[0][0]) <= notifier.MESSAGE_LIMIT
+
+    sent = []
+
+    async def mock_send(self, chat_id, text, parse_mode=None, disable_web_page_preview=None):
+        sent.append(text)
+
+    monkeypatch.setattr('telegram.Bot.send_message', mock_send, raising=False)
+    assert asyncio.run(notifier.notify_user(project))
+    assert len(sent[0]) <= notifier.MESSAGE_LIMIT
+    # Текст укорачивается до экранирования, поэтому сущности не обрезаются
+    assert sent[0].count('&lt') == sent[0].count('&lt;')
+
+
+def test_digest_worker_sends_one_message(monkeypatch):
+    import utils.notifier as notifier
+
+    sent = []
+
+    async def mock_send(self, chat_id, text, parse_mode=None, disable_web_page_preview=None):
+        sent.append(text)
+
+    monkeypatch.setattr('telegram.Bot.send_message', mock_send, raising=False)
+    monkeypatch.setattr(notifier, 'NOTIFY_DIGEST_WINDOW', 0.05)
+    logging.getLogger('utils.notifier').disabled = True
+    projects = [{'title': f't{i}', 'link': f'https://fl.ru/projects/{i}/', 'description': 'd'} for i in range(5)]
+
+    async def run():
+        notifier.start_workers(digest=True)
+        await notifier.enqueue_projects(projects)
+        await notifier.wait_notifications()
+        await notifier.stop_workers()
+
+    asyncio.run(run())
+    assert len(sent) == 1
+    assert all(f'Новый заказ:</b> t{i}' in sent[0] for i in range(5))
+    assert sent[0].count('/addkeyword') == 1
+    assert all(storage.has_sent_link(p['link']) for p in projects)
+
+
+def test_outbox_retries_failed_send_and_survives_restart(monkeypatch):
+    import utils.notifier as notifier
+
+    sent = []
+    failing = {'on': True}
+
+    async def mock_send(self, chat_id, text, parse_mode=None, disable_web_page_preview=None):
+        if failing['on']:
+            raise RuntimeError('network down')
+        sent.append(text)
+
+    monkeypatch.setattr('telegram.Bot.send_message', mock_send, raising=False)
+    monkeypatch.setattr(notifier, 'OUTBOX_RETRY_BASE', 0.05)
+    logging.getLogger('utils.notifier').disabled = True
+    projects = [{'title': f't{i}', 'link': f'https://kwork.ru/projects/{i}', 'description': 'd'} for i in range(2)]
+
+    async def first_run():
+        notifier.start_workers(2)
+        await notifier.enqueue_projects(projects)
+        await notifier.wait_notifications()
+        await notifier.stop_workers()
+
+    asyncio.run(first_run())
+    # Неудачные отправки остались в очереди с отложенным повтором
+    assert sent == []
+    pending = storage.due_outbox(now=time.time() + 1)
+    assert len(pending) == 2 and all(attempts == 1 for _, _, attempts in pending)
+
+    failing['on'] = False
+
+    async def second_run():
+        notifier.start_workers(2)
+        await asyncio.sleep(0.1)
+        await notifier.wait_notifications()
+        await notifier.stop_workers()
+
+    asyncio.run(second_run())
+    assert len(sent) == 2
+    assert storage.due_outbox(now=time.time() + 3600) == []
+    assert all(storage.has_sent_link(p['link']) for p in projects)
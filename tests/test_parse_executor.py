@@ -0,0 +1,42 @@
+import asyncio
+import os
+
+from parsers import base_parser
+from conftest import FakeFetcher
+from parsers.fl_ru import FLRuParser
+from parsers.specs import extract_listing
+
+HTML = (
+    '<div class="b-post">\n'
+    '  <a class="b-post__link" href="/p1">Создать сайт</a>\n'
+    '  <div class="b-post__txt">Описание</div>\n'
+    '</div>'
+)
+
+
+def test_parsing_runs_in_worker_process(monkeypatch):
+    monkeypatch.setattr(base_parser, 'PARSE_WORKERS', 1)
+    parser = FLRuParser(fetcher=FakeFetcher(HTML))
+
+    async def run():
+        worker_pid = await parser._parse_in_executor(os.getpid)
+        projects = await parser.async_find_projects()
+        return worker_pid, projects
+
+    try:
+        worker_pid, projects = asyncio.run(run())
+    finally:
+        base_parser.shutdown_parse_executor()
+
+    assert worker_pid != os.getpid()
+    assert [p['title'] for p in projects] == ['Создать сайт']
+
+
+def test_extract_listing_returns_plain_records():
+    projects = extract_listing('FL.ru', HTML, 'https://www.fl.ru')
+    assert projects == [{
+        'title': 'Создать сайт',
+        'link': 'https://www.fl.ru/p1',
+        'description': 'Описание',
+        'price': 'Цена не указана',
+    }]
@@ -0,0 +1,110 @@
+import asyncio
+from unittest.mock import Mock
+
+import main
+from utils import notifier
+from utils.polling import AdaptivePollInterval
+
+
+class _StreamingParser:
+    def __init__(self, batches, gate=None, error=None):
+        self.batches = batches
+        self.gate = gate
+        self.error = error
+
+    async def stream_projects(self):
+        if self.gate is not None:
+            await self.gate.wait()
+        for batch in self.batches:
+            yield batch
+        if self.error is not None:
+            raise self.error
+
+
+def _use_parsers(monkeypatch, parsers):
+    """Подставляет парсеры в реестр и возвращает планировщик-заглушку"""
+    scheduler = Mock()
+    monkeypatch.setattr(main.registry, 'get_parser', parsers.__getitem__)
+    monkeypatch.setattr(main, '_scheduler', scheduler)
+    monkeypatch.setattr(main, '_intervals', {name: AdaptivePollInterval(20) for name in parsers})
+    return scheduler
+
+
+async def _check_sources(*names):
+    # Как планировщик: у каждого сайта своя задача, они идут параллельно
+    await asyncio.wait_for(asyncio.gather(*(main.parse_source_job(name) for name in names)), 5)
+
+
+def test_fast_parser_is_not_delayed_by_slow_one(monkeypatch):
+    async def run():
+        gate = asyncio.Event()
+        enqueued = []
+
+        async def enqueue(projects):
+            enqueued.append([p['title'] for p in projects])
+            # Медленный парсер продолжит только после того, как заказы быстрого
+            # уже ушли в очередь отправки
+            if projects[0]['title'].startswith('fast'):
+                gate.set()
+            return len(projects)
+
+        monkeypatch.setattr(notifier, 'enqueue_projects', enqueue)
+        _use_parsers(monkeypatch, {
+            'Slow': _StreamingParser([[{'title': 'slow'}]], gate=gate),
+            'Fast': _StreamingParser([[{'title': 'fast-1'}], [{'title': 'fast-2'}]]),
+            'Broken': _StreamingParser([[{'title': 'partial'}]], error=RuntimeError('down')),
+        })
+        await _check_sources('Slow', 'Fast', 'Broken')
+        return enqueued
+
+    # Порядок событий разных сайтов не задан: предохранитель обращается к
+    # базе в отдельном потоке. Проверяем только, что быстрый сайт не ждет медленный
+    titles = [title for batch in asyncio.run(run()) for title in batch]
+    assert titles.index('fast-1') < titles.index('slow')
+    # Заказы со страниц, прочитанных до ошибки, не теряются
+    assert set(titles) == {'fast-1', 'fast-2', 'slow', 'partial'}
+    # Сайты с новыми заказами проверяются чаще, упавший — реже
+    assert main._intervals['Fast'].minutes == 10
+    assert main._intervals['Broken'].minutes == 30
+
+
+class _HangingParser:
+    async def stream_projects(self):
+        yield [{'title': 'first page'}]
+        await asyncio.sleep(3600)
+        yield [{'title': 'never'}]
+
+
+def test_hung_parser_is_cut_off_and_breaker_opens(monkeypatch):
+    enqueued = []
+
+    async def enqueue(projects):
+        enqueued.extend(p['title'] for p in projects)
+        return len(projects)
+
+    monkeypatch.setattr(notifier, 'enqueue_projects', enqueue)
+    monkeypatch.setattr(main, 'PARSER_TIMEOUT', 0.05)
+    monkeypatch.setattr(main._breaker, 'threshold', 1)
+    scheduler = _use_parsers(monkeypatch, {'Hung': _HangingParser()})
+
+    asyncio.run(_check_sources('Hung'))
+    assert enqueued == ['first page']
+    scheduler.reschedule_job.assert_called_with(
+        'parse_Hung', trigger='interval', minutes=30, jitter=main.POLL_JITTER
+    )
+
+    # Сайт на паузе: следующая проверка его не запускает
+    enqueued.clear()
+    asyncio.run(_check_sources('Hung'))
+    assert enqueued == []
+
+
+def test_failed_requests_count_as_breaker_failure(monkeypatch):
+    from conftest import FakeFetcher
+    from parsers.fl_ru import FLRuParser
+    from utils import storage
+
+    parser = FLRuParser(fetcher=FakeFetcher('', status=503))
+    assert asyncio.run(main._run_parser('FLRu', parser)) == 0
+    assert parser.request_errors == 1
+    assert storage.load_source_health('FLRu')[0] == 1
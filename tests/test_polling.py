@@ -0,0 +1,17 @@
+from utils.polling import AdaptivePollInterval
+
+
+def test_interval_speeds_up_and_slows_down_within_bounds():
+    interval = AdaptivePollInterval(initial=30, minimum=5, maximum=60)
+    assert interval.update(found=2) == 15
+    assert interval.update(found=1) == 7.5
+    assert interval.update(found=1) == 5
+    assert interval.update(found=0) == 7.5
+    for _ in range(20):
+        interval.update(found=0)
+    assert interval.minutes == 60
+
+
+def test_initial_interval_is_clamped():
+    assert AdaptivePollInterval(initial=1, minimum=5, maximum=60).minutes == 5
+    assert AdaptivePollInterval(initial=90, minimum=5, maximum=60).minutes == 60
@@ -0,0 +1,54 @@
+import asyncio
+import pytest
+
+from utils.rate_limit import AdaptiveRateLimiter, RateLimitExceeded, TokenBucket, parse_retry_after
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_spacing():
+    clock = _Clock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    clock.now += 10
+    assert bucket.reserve() == 0
+
+
+def test_limiter_adapts_to_responses():
+    clock = _Clock()
+    limiter = AdaptiveRateLimiter(1.0, 0.1, 1.2, increase=0.1, clock=clock)
+    limiter.record('https://www.fl.ru/projects/', 200)
+    limiter.record('https://www.fl.ru/projects/', 200)
+    limiter.record('https://www.fl.ru/projects/', 200)
+    assert limiter.bucket('www.fl.ru').rate == pytest.approx(1.2)
+
+    limiter.record('https://www.fl.ru/projects/', 429)
+    assert limiter.bucket('www.fl.ru').rate == pytest.approx(0.6)
+    # Другие хосты не затронуты
+    assert limiter.bucket('kwork.ru').rate == pytest.approx(1.0)
+
+
+def test_limiter_honours_retry_after():
+    clock = _Clock()
+    limiter = AdaptiveRateLimiter(1.0, 0.1, 2.0, max_wait=60, clock=clock)
+    limiter.record('https://kwork.ru/orders', 429, '30')
+    assert limiter.delay('kwork.ru') == pytest.approx(30)
+
+    limiter.record('https://kwork.ru/orders', 403, '300')
+    with pytest.raises(RateLimitExceeded):
+        asyncio.run(limiter.acquire('https://kwork.ru/orders'))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('120') == 120
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0
+    assert parse_retry_after('garbage') is None
+    assert parse_retry_after(None) is None
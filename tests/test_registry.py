@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+
+from parsers import registry
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_enabled_parsers_skip_unknown_and_duplicates(monkeypatch):
+    monkeypatch.setattr(registry, 'ENABLED_PARSERS', ['KworkRu', 'Nope', 'KworkRu', 'FLRu'])
+    assert registry.enabled_parsers() == ['KworkRu', 'FLRu']
+
+
+def test_get_parser_builds_once(monkeypatch):
+    monkeypatch.setattr(registry, '_instances', {})
+    parser = registry.get_parser('KworkRu')
+    assert parser.name == 'Kwork.ru'
+    assert registry.get_parser('KworkRu') is parser
+
+
+def test_disabled_parsers_are_not_imported(tmp_path):
+    code = (
+        "import sys, main\n"
+        "from parsers import registry\n"
+        "main.create_scheduler()\n"
+        "assert not any(m in sys.modules for m in ('parsers.fl_ru', 'parsers.upwork'))\n"
+        "registry.get_parser('FLRu')\n"
+        "assert 'parsers.fl_ru' in sys.modules and 'parsers.upwork' not in sys.modules\n"
+    )
+    env = dict(os.environ, PARSERS='FLRu', PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+
+
+def test_registry_import_is_light(tmp_path):
+    code = (
+        "import sys\n"
+        "from parsers import registry\n"
+        "registry.enabled_parsers()\n"
+        "heavy = [m for m in ('parsers.base_parser', 'aiohttp', 'bs4', 'lxml') if m in sys.modules]\n"
+        "assert not heavy, heavy\n"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
@@ -1,3 +1,4 @@
+import asyncio
 import importlib
 from unittest.mock import Mock, patch
 
@@ -6,6 +7,9 @@ from utils import storage
 import config
 
 
+PARSER_NAMES = ['FreelanceRu', 'FLRu', 'KworkRu', 'Upwork']
+
+
 def test_scheduler_interval(monkeypatch, tmp_path):
     storage.init(tmp_path / "sched.db")
     monkeypatch.setattr(config, 'CRON_EXPRESSION', None, raising=False)
@@ -15,14 +19,17 @@ def test_scheduler_interval(monkeypatch, tmp_path):
         import main
         importlib.reload(main)
         scheduler = main.create_scheduler()
-        scheduler_mock.add_job.assert_called_with(
-            main.async_job,
-            'interval',
-            minutes=42,
-            id='parse_job',
-            name='Parse job',
-            replace_existing=True
-        )
+        for name in PARSER_NAMES:
+            scheduler_mock.add_job.assert_any_call(
+                main.parse_source_job,
+                'interval',
+                minutes=42,
+                jitter=main.POLL_JITTER,
+                args=[name],
+                id=f'parse_{name}',
+                name=f'Parse {name}',
+                replace_existing=True
+            )
 
 
 def test_scheduler_cron(monkeypatch, tmp_path):
@@ -36,11 +43,153 @@ def test_scheduler_cron(monkeypatch, tmp_path):
         importlib.reload(main)
         scheduler = main.create_scheduler()
         cron_patch.assert_called_with('*/5 * * * *')
-        scheduler_mock.add_job.assert_called_with(
-            main.async_job,
-            trigger_mock,
-            id='parse_job',
-            name='Parse job',
+        for name in PARSER_NAMES:
+            scheduler_mock.add_job.assert_any_call(
+                main.parse_source_job,
+                trigger_mock,
+                args=[name],
+                id=f'parse_{name}',
+                name=f'Parse {name}',
+                replace_existing=True
+            )
+
+
+def test_source_interval_adapts_to_matches(monkeypatch, tmp_path):
+    storage.init(tmp_path / "sched.db")
+    monkeypatch.setattr(config, 'CRON_EXPRESSION', None, raising=False)
+    monkeypatch.setattr(config, 'PARSING_INTERVAL', 20, raising=False)
+    scheduler_mock = Mock()
+    with patch('apscheduler.schedulers.asyncio.AsyncIOScheduler', return_value=scheduler_mock):
+        import main
+        importlib.reload(main)
+        main.create_scheduler()
+
+    found = {'count': 3}
+
+    async def stream(name, parser):
+        return found['count']
+
+    monkeypatch.setattr(main, '_stream_parser', stream)
+    asyncio.run(main.parse_source_job('FLRu'))
+    scheduler_mock.reschedule_job.assert_called_with(
+        'parse_FLRu', trigger='interval', minutes=10, jitter=main.POLL_JITTER
+    )
+
+    found['count'] = 0
+    asyncio.run(main.parse_source_job('FLRu'))
+    scheduler_mock.reschedule_job.assert_called_with(
+        'parse_FLRu', trigger='interval', minutes=15, jitter=main.POLL_JITTER
+    )
+
+
+def test_interval_grows_when_only_sent_projects_found(monkeypatch, tmp_path):
+    storage.init(tmp_path / "sched.db")
+    monkeypatch.setattr(config, 'CRON_EXPRESSION', None, raising=False)
+    monkeypatch.setattr(config, 'PARSING_INTERVAL', 20, raising=False)
+    sent = []
+
+    async def send_message(self, chat_id, text, **kwargs):
+        sent.append(text)
+
+    monkeypatch.setattr('telegram.Bot.send_message', send_message, raising=False)
+    scheduler_mock = Mock()
+    with patch('apscheduler.schedulers.asyncio.AsyncIOScheduler', return_value=scheduler_mock):
+        import main
+        importlib.reload(main)
+        main.create_scheduler()
+
+    class Parser:
+        request_errors = 0
+
+        async def stream_projects(self):
+            # Первая страница каждый раз содержит те же подходящие заказы
+            yield [{'title': 'python', 'link': 'https://fl.ru/p/1', 'description': ''}]
+
+    monkeypatch.setattr(main.registry, 'get_parser', lambda name: Parser())
+    asyncio.run(main.parse_source_job('FLRu'))
+    scheduler_mock.reschedule_job.assert_called_with(
+        'parse_FLRu', trigger='interval', minutes=10, jitter=main.POLL_JITTER
+    )
+
+    asyncio.run(main.parse_source_job('FLRu'))
+    assert len(sent) == 1
+    scheduler_mock.reschedule_job.assert_called_with(
+        'parse_FLRu', trigger='interval', minutes=15, jitter=main.POLL_JITTER
+    )
+
+
+def test_scheduler_adds_maintenance_job(monkeypatch, tmp_path):
+    storage.init(tmp_path / "sched.db")
+    monkeypatch.setattr(config, 'CRON_EXPRESSION', None, raising=False)
+    monkeypatch.setattr(config, 'STORAGE_MAINTENANCE_HOURS', 12, raising=False)
+    scheduler_mock = Mock()
+    with patch('apscheduler.schedulers.asyncio.AsyncIOScheduler', return_value=scheduler_mock):
+        import main
+        importlib.reload(main)
+        main.create_scheduler()
+        scheduler_mock.add_job.assert_any_call(
+            main.maintenance_job,
+            'interval',
+            hours=12,
+            id='maintenance_job',
+            name='Storage maintenance',
             replace_existing=True
         )
 
+
+def test_scheduler_runs_single_flight_jobs(monkeypatch, tmp_path):
+    from datetime import timezone
+    storage.init(tmp_path / "sched.db")
+    monkeypatch.setattr(config, 'CRON_EXPRESSION', None, raising=False)
+    scheduler_mock = Mock()
+    with patch('apscheduler.schedulers.asyncio.AsyncIOScheduler', return_value=scheduler_mock) as scheduler_cls:
+        import main
+        importlib.reload(main)
+        main.create_scheduler()
+        scheduler_cls.assert_called_with(timezone=main.TIMEZONE, job_defaults=main.JOB_DEFAULTS)
+        assert main.JOB_DEFAULTS['max_instances'] == 1
+        assert main.JOB_DEFAULTS['coalesce'] is True
+        scheduler_mock.add_listener.assert_called_once()
+
+        scheduler_mock.timezone = timezone.utc
+        main.run_parse_jobs_now(scheduler_mock)
+        modified = [c.args[0] for c in scheduler_mock.modify_job.call_args_list]
+        assert modified == [f'parse_{name}' for name in PARSER_NAMES]
+
+
+def test_job_lag_is_reported(caplog):
+    from datetime import datetime, timedelta, timezone
+    from apscheduler.events import EVENT_JOB_SUBMITTED, JobSubmissionEvent
+    import main
+
+    now = datetime.now(timezone.utc)
+    event = JobSubmissionEvent(
+        EVENT_JOB_SUBMITTED, 'parse_FLRu', 'default', [now - timedelta(minutes=5), now]
+    )
+    with caplog.at_level('WARNING', logger=main.logger.name):
+        main._on_job_event(event)
+    assert 'parse_FLRu' in caplog.text
+    assert 'объединено запусков: 2' in caplog.text
+
+
+def test_source_check_is_single_flight(monkeypatch, tmp_path):
+    storage.init(tmp_path / "sched.db")
+    import main
+
+    started = []
+
+    async def stream(name, parser):
+        started.append(name)
+        await asyncio.sleep(0.05)
+        return 0
+
+    monkeypatch.setattr(main, '_stream_parser', stream)
+
+    async def run():
+        return await asyncio.gather(
+            main._run_parser('FLRu', object()),
+            main._run_parser('FLRu', object()),
+        )
+
+    asyncio.run(run())
+    assert started == ['FLRu']
@@ -0,0 +1,48 @@
+from utils import seen_links, storage
+from utils.links import link_key
+
+
+def test_seen_after_mark_and_reopen():
+    assert not seen_links.is_seen('https://example.com/1')
+    seen_links.mark_seen('https://example.com/1')
+    assert seen_links.is_seen('https://example.com/1')
+    assert storage.has_sent_link('https://example.com/1')
+
+    seen_links.close()
+    assert seen_links.is_seen('https://example.com/1')
+    assert not seen_links.is_seen('https://example.com/2')
+
+
+def test_filter_rebuilt_from_table():
+    # Ссылка есть в базе, но не в фильтре (например, файл фильтра удален)
+    storage.save_sent_link('https://example.com/old')
+    assert seen_links.is_seen('https://example.com/old')
+    assert seen_links.get_index().path.exists()
+
+
+def test_false_positive_confirmed_by_table(monkeypatch):
+    index = seen_links.get_index()
+    monkeypatch.setattr(seen_links.BloomFilter, '__contains__', lambda self, link: True)
+    assert not index.__contains__('https://example.com/never-sent')
+
+
+def test_filter_grows_past_capacity(tmp_path):
+    index = seen_links.SeenLinks(storage.DB_FILE, capacity=4, error_rate=0.01)
+    links = [f'https://example.com/{i}' for i in range(20)]
+    for link in links:
+        index.add(link)
+    assert index._bloom.capacity >= 20
+    assert all(link in index for link in links)
+    index.close()
+
+
+def test_bloom_has_no_false_negatives(tmp_path):
+    bloom = seen_links.BloomFilter(tmp_path / 'test.bloom', capacity=1000, error_rate=0.01)
+    keys = [link_key(f'https://example.com/{i}') for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(link_key(f'https://other.com/{i}') in bloom for i in range(1000))
+    assert false_positives < 50
+    assert bloom.count == 1000
+    bloom.close()
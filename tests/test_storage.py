@@ -0,0 +1,173 @@
+import sqlite3
+import time
+
+from utils import storage
+from utils.links import link_key
+
+
+def _stored_links(*links):
+    # Отдельное соединение видит только закоммиченные строки
+    with sqlite3.connect(storage.DB_FILE) as conn:
+        keys = {row[0] for row in conn.execute("SELECT key FROM sent_links")}
+    return {link for link in links if link_key(link) in keys} if links else keys
+
+
+def test_wal_mode_enabled():
+    mode = storage._get_conn().execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == 'wal'
+
+
+def test_sent_links_are_batched_until_flush():
+    storage.save_sent_link('https://example.com/1')
+    storage.save_sent_link('https://example.com/2')
+    assert storage.has_sent_link('https://example.com/1')
+    assert _stored_links() == set()
+
+    storage.flush_sent_links()
+    assert _stored_links() == {link_key('https://example.com/1'), link_key('https://example.com/2')}
+
+
+def test_batch_written_when_size_reached(monkeypatch):
+    monkeypatch.setattr(storage, 'SENT_LINKS_BATCH_SIZE', 3)
+    for i in range(3):
+        storage.save_sent_link(f'https://example.com/{i}')
+    assert len(_stored_links()) == 3
+
+
+def test_batch_written_when_interval_passed(monkeypatch):
+    monkeypatch.setattr(storage, 'SENT_LINKS_FLUSH_INTERVAL', 0)
+    storage.save_sent_link('https://example.com/1')
+    assert _stored_links() == {link_key('https://example.com/1')}
+
+
+def test_bulk_save_uses_one_transaction():
+    statements = []
+    conn = storage._get_conn()
+    conn.set_trace_callback(statements.append)
+    try:
+        storage.save_sent_links(f'https://example.com/{i}' for i in range(200))
+    finally:
+        conn.set_trace_callback(None)
+    assert len(_stored_links()) == 200
+    assert sum(s.startswith('COMMIT') for s in statements) == 1
+
+
+def test_reinit_flushes_pending_links(tmp_path):
+    storage.save_sent_link('https://example.com/1')
+    path = storage.DB_FILE
+    storage.init(tmp_path / 'other.db')
+    storage.init(path)
+    assert storage.has_sent_link('https://example.com/1')
+
+
+def test_migration_keys_old_links(tmp_path):
+    path = tmp_path / 'old.db'
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE sent_links (link TEXT PRIMARY KEY)")
+        conn.execute("INSERT INTO sent_links VALUES ('https://www.fl.ru/projects/5123/site/')")
+
+    storage.init(path)
+    conn = storage._get_conn()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(storage._MIGRATIONS)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(sent_links)")]
+    assert columns == ['key', 'first_seen', 'source']
+    first_seen, source = conn.execute("SELECT first_seen, source FROM sent_links").fetchone()
+    assert first_seen is not None and source is None
+
+    # Повторная инициализация не применяет миграции заново
+    storage.init(path)
+    assert storage.has_sent_link('https://fl.ru/projects/5123/?utm_source=tg')
+
+
+def test_source_is_stored():
+    storage.save_sent_link('https://www.fl.ru/projects/1/', 'FL.ru')
+    storage.flush_sent_links()
+    row = storage._get_conn().execute("SELECT source FROM sent_links").fetchone()
+    assert row == ('FL.ru',)
+
+
+def test_maintain_prunes_old_links():
+    storage.save_sent_links(['https://example.com/new'])
+    conn = storage._get_conn()
+    with conn:
+        conn.execute(
+            "INSERT INTO sent_links(key, first_seen) VALUES (?, ?)",
+            (link_key('https://example.com/old'), int(time.time()) - 100 * 86400),
+        )
+
+    storage.maintain(retention_days=30)
+    assert _stored_links('https://example.com/new', 'https://example.com/old') == {'https://example.com/new'}
+
+
+def test_maintain_keeps_everything_without_retention():
+    conn = storage._get_conn()
+    with conn:
+        conn.execute(
+            "INSERT INTO sent_links(key, first_seen) VALUES (?, 0)", (link_key('https://example.com/old'),)
+        )
+    storage.maintain(retention_days=0)
+    assert _stored_links('https://example.com/old') == {'https://example.com/old'}
+
+
+def test_archive_upserts_and_searches():
+    project = {'title': 'Верстка сайта', 'link': 'https://kwork.ru/projects/1', 'description': 'Лендинг'}
+    storage.archive_projects([project], 'Kwork.ru')
+    storage.archive_projects([dict(project, title='Верстка магазина')], 'Kwork.ru')
+
+    conn = storage._get_conn()
+    assert conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0] == 1
+    assert [p['title'] for p in storage.search_projects('магазин')] == ['Верстка магазина']
+    # Старый заголовок удален из индекса вместе со строкой
+    assert storage.search_projects('сайта') == []
+    assert storage.search_projects('ЛЕНД')[0]['source'] == 'Kwork.ru'
+
+
+def test_archive_does_not_rewrite_unchanged_projects(monkeypatch):
+    project = {'title': 'Верстка сайта', 'link': 'https://kwork.ru/projects/1', 'description': 'Лендинг'}
+    storage.archive_projects([project], 'Kwork.ru')
+    conn = storage._get_conn()
+    monkeypatch.setattr(storage.time, 'time', lambda: 2_000_000_000)
+
+    before = conn.total_changes
+    storage.archive_projects([project], 'Kwork.ru')
+    # Только last_seen: триггеры полнотекстового индекса не срабатывают
+    assert conn.total_changes - before == 1
+    assert conn.execute("SELECT last_seen FROM projects").fetchone()[0] == 2_000_000_000
+    assert storage.search_projects('лендинг')[0]['title'] == 'Верстка сайта'
+
+
+def test_search_ignores_fts_syntax():
+    storage.archive_projects([{'title': 'a OR b', 'link': 'https://example.com/1', 'description': ''}])
+    # Операторы FTS5 во вводе ищутся как обычные слова
+    assert [p['link'] for p in storage.search_projects('" OR (')] == ['https://example.com/1']
+    assert storage.search_projects('***') == []
+
+
+def test_maintain_prunes_archive():
+    storage.archive_projects([{'title': 'Старый', 'link': 'https://example.com/1', 'description': ''}])
+    conn = storage._get_conn()
+    with conn:
+        conn.execute("UPDATE projects SET last_seen=0")
+    storage.maintain(archive_days=30)
+    assert storage.search_projects('старый') == []
+
+
+def test_outbox_enqueue_retry_and_complete():
+    projects = [{'title': f't{i}', 'link': f'https://kwork.ru/projects/{i}', 'description': ''} for i in range(3)]
+    storage.save_sent_link(projects[2]['link'])
+    storage.flush_sent_links()
+    # Уже отправленный заказ и повтор не попадают в очередь
+    assert storage.enqueue_outbox(projects + projects[:1]) == 2
+    due = storage.due_outbox()
+    assert sorted(project['title'] for _, project, _ in due) == ['t0', 't1']
+
+    key = due[0][0]
+    retry_at = time.time() + 60
+    storage.retry_outbox(key, 1, retry_at, 'timeout')
+    assert [k for k, _, _ in storage.due_outbox()] == [due[1][0]]
+    assert storage.next_outbox_attempt() == retry_at
+    assert {k: attempts for k, _, attempts in storage.due_outbox(now=retry_at)}[key] == 1
+
+    storage.complete_outbox([k for k, _, _ in due])
+    assert storage.due_outbox(now=retry_at) == []
+    assert storage.next_outbox_attempt() is None
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple, TypeVar
+
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        # One thread: SQLite has a single writer anyway, and a FIFO queue keeps
+        # writes in the order the coroutines issued them
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+    return _executor
+
+
+async def run(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking storage call on the storage thread and await the result.
+
+    Coroutines use this instead of calling ``utils.storage`` directly, so a
+    slow disk delays only the awaiting task, not the whole event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), func, *args)
+
+
+async def load_crawl_mark(source: str) -> List[str]:
+    return await run(storage.load_crawl_mark, source)
+
+
+async def save_crawl_mark(source: str, links: Iterable[str]) -> None:
+    await run(storage.save_crawl_mark, source, list(links))
+
+
+async def load_http_validators(url: str) -> Optional[Tuple[str | None, str | None, str | None, str | None]]:
+    return await run(storage.load_http_validators, url)
+
+
+async def save_http_validators(
+    url: str,
+    etag: str | None,
+    last_modified: str | None,
+    body_hash: str | None,
+    variant: str | None = None,
+) -> None:
+    await run(storage.save_http_validators, url, etag, last_modified, body_hash, variant)
+
+
+async def flush_sent_links() -> None:
+    await run(storage.flush_sent_links)
+
+
+async def archive_projects(projects: Iterable[dict], source: str | None = None) -> None:
+    await run(storage.archive_projects, list(projects), source)
+
+
+async def search_projects(text: str, limit: int = 10) -> List[dict]:
+    return await run(storage.search_projects, text, limit)
+
+
+async def enqueue_outbox(projects: Iterable[dict]) -> int:
+    return await run(storage.enqueue_outbox, list(projects))
+
+
+async def due_outbox(limit: int = 100) -> List[Tuple[int, dict, int]]:
+    return await run(storage.due_outbox, limit)
+
+
+async def next_outbox_attempt() -> Optional[float]:
+    return await run(storage.next_outbox_attempt)
+
+
+async def complete_outbox(keys: Iterable[int]) -> None:
+    await run(storage.complete_outbox, list(keys))
+
+
+async def retry_outbox(key: int, attempts: int, next_attempt: float, error: str | None = None) -> None:
+    await run(storage.retry_outbox, key, attempts, next_attempt, error)
+
+
+async def load_source_health(source: str) -> Tuple[int, float]:
+    return await run(storage.load_source_health, source)
+
+
+async def save_source_health(source: str, failures: int, opened_until: float) -> None:
+    await run(storage.save_source_health, source, failures, opened_until)
+
+
+def shutdown() -> None:
+    """Wait for queued writes and stop the storage thread."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
@@ -0,0 +1,60 @@
+import logging
+import time
+from typing import Callable, Set
+
+from config import BREAKER_FAILURES, BREAKER_COOLDOWN
+from utils import async_storage
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Per-source circuit breaker whose state is kept in SQLite.
+
+    While closed every check runs. ``threshold`` failed checks in a row open
+    the breaker: the source is skipped for ``cooldown`` seconds. After the
+    cool-down one probe check is let through (half-open); success closes the
+    breaker, another failure opens it for the next cool-down. The state
+    survives restarts, so a site that is down is not hit on every start.
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_FAILURES,
+        cooldown: float = BREAKER_COOLDOWN,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.threshold = max(threshold, 1)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._probing: Set[str] = set()
+
+    async def allow(self, source: str) -> bool:
+        """Return True if the source may be checked now."""
+        failures, opened_until = await async_storage.load_source_health(source)
+        if failures < self.threshold:
+            return True
+        if self._clock() < opened_until or source in self._probing:
+            return False
+        logger.info("Пробная проверка %s после паузы", source)
+        self._probing.add(source)
+        return True
+
+    async def record_success(self, source: str) -> None:
+        self._probing.discard(source)
+        failures, _ = await async_storage.load_source_health(source)
+        if failures:
+            if failures >= self.threshold:
+                logger.info("%s снова отвечает, проверки возобновлены", source)
+            await async_storage.save_source_health(source, 0, 0.0)
+
+    async def record_failure(self, source: str) -> None:
+        self._probing.discard(source)
+        failures, opened_until = await async_storage.load_source_health(source)
+        failures += 1
+        if failures >= self.threshold:
+            opened_until = self._clock() + self.cooldown
+            logger.warning(
+                "%s: %s неудачных проверок подряд, пауза %.0f с", source, failures, self.cooldown
+            )
+        await async_storage.save_source_health(source, failures, opened_until)
@@ -44,8 +44,10 @@ DEFAULT_EXCLUDE_WORDS = [
 ]
 
 import os
+import threading
 from pathlib import Path
 from . import storage
+from .matcher import KeywordMatcher
 
 
 def _load_list_from_file(file_path: str) -> list[str] | None:
@@ -66,38 +68,114 @@ def _load_list_from_env(var_name: str) -> list[str] | None:
     return None
 
 
-KEYWORDS = (
-    _load_list_from_file(os.getenv('KEYWORDS_FILE', ''))
-    or _load_list_from_env('KEYWORDS')
-    or list(DEFAULT_KEYWORDS)
-)
-
-EXCLUDE_WORDS = (
-    _load_list_from_file(os.getenv('EXCLUDE_WORDS_FILE', ''))
-    or _load_list_from_env('EXCLUDE_WORDS')
-    or list(DEFAULT_EXCLUDE_WORDS)
-)
-
-# Override with values stored in the database if present
-stored_inc = storage.load_keywords(True)
-if stored_inc:
-    KEYWORDS = list(stored_inc)
-stored_exc = storage.load_keywords(False)
-if stored_exc:
-    EXCLUDE_WORDS = list(stored_exc)
+_lock = threading.RLock()
+_version = 0
+_matcher: KeywordMatcher | None = None
+# Loaded on first use (see load), not at import: importing the module must
+# not open the database
+_keywords: list[str] | None = None
+_exclude_words: list[str] | None = None
+
+
+def load() -> None:
+    """Read the keyword lists once: file or env or defaults, overridden by the database."""
+    global _keywords, _exclude_words
+    if _keywords is not None:
+        return
+    with _lock:
+        if _keywords is not None:
+            return
+        include = (
+            _load_list_from_file(os.getenv('KEYWORDS_FILE', ''))
+            or _load_list_from_env('KEYWORDS')
+            or list(DEFAULT_KEYWORDS)
+        )
+        exclude = (
+            _load_list_from_file(os.getenv('EXCLUDE_WORDS_FILE', ''))
+            or _load_list_from_env('EXCLUDE_WORDS')
+            or list(DEFAULT_EXCLUDE_WORDS)
+        )
+        # Override with values stored in the database if present
+        include = list(storage.load_keywords(True)) or include
+        exclude = list(storage.load_keywords(False)) or exclude
+        _exclude_words = exclude
+        _keywords = include
+
+
+def get_keywords() -> list[str]:
+    load()
+    return _keywords
+
+
+def get_exclude_words() -> list[str]:
+    load()
+    return _exclude_words
+
+
+def __getattr__(name: str):
+    # KEYWORDS / EXCLUDE_WORDS stay readable as module attributes
+    if name == 'KEYWORDS':
+        return get_keywords()
+    if name == 'EXCLUDE_WORDS':
+        return get_exclude_words()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _publish() -> KeywordMatcher:
+    """Compile the current lists into a new snapshot and swap it in."""
+    global _version, _matcher
+    _version += 1
+    _matcher = KeywordMatcher(_keywords, _exclude_words, version=_version)
+    return _matcher
+
+
+def get_matcher() -> KeywordMatcher:
+    """Return the compiled snapshot of the current include/exclude words.
+
+    The snapshot is immutable and only rebuilt when the keyword set changes,
+    so a parse that grabbed it keeps a consistent view even if a bot command
+    edits the keywords meanwhile.
+    """
+    matcher = _matcher
+    if matcher is None:
+        load()
+        with _lock:
+            matcher = _matcher or _publish()
+    return matcher
+
+
+def set_keywords(include: list[str] | None = None, exclude: list[str] | None = None) -> None:
+    """Replace the in-memory keyword lists without touching storage."""
+    global _keywords, _exclude_words
+    load()
+    with _lock:
+        if include is not None:
+            _keywords = list(include)
+        if exclude is not None:
+            _exclude_words = list(exclude)
+        _publish()
 
 
 def add_keyword(word: str) -> None:
     """Add a keyword and persist it."""
+    global _keywords
     word = word.strip().lower()
-    if word and word not in KEYWORDS:
-        KEYWORDS.append(word)
-        storage.save_keyword(word, True)
+    load()
+    with _lock:
+        if word and word not in _keywords:
+            # Copy-on-write: code iterating the old list is not affected
+            _keywords = _keywords + [word]
+            storage.save_keyword(word, True)
+            _publish()
 
 
 def remove_keyword(word: str) -> None:
     """Remove a keyword and update storage."""
+    global _keywords
     word = word.strip().lower()
-    if word in KEYWORDS:
-        KEYWORDS.remove(word)
-        storage.delete_keyword(word, True)
+    load()
+    with _lock:
+        if word in _keywords:
+            _keywords = [w for w in _keywords if w != word]
+            storage.delete_keyword(word, True)
+            _publish()
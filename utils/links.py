@@ -0,0 +1,40 @@
+import hashlib
+import re
+from typing import Dict, Pattern
+from urllib.parse import urlsplit
+
+# Stable project id in the URL path of each board. Titles in the slug,
+# tracking parameters and trailing slashes change; the id does not.
+PROJECT_ID_PATTERNS: Dict[str, Pattern[str]] = {
+    "fl.ru": re.compile(r"/projects/(\d+)"),
+    "kwork.ru": re.compile(r"/projects/(\d+)"),
+    "freelance.ru": re.compile(r"(\d+)(?:\.html)?/?$"),
+    "upwork.com": re.compile(r"(~[0-9a-z]+)", re.IGNORECASE),
+}
+
+
+def _host(netloc: str) -> str:
+    host = netloc.lower().rsplit("@", 1)[-1].split(":", 1)[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def canonical_link(link: str) -> str:
+    """Return a source-independent identity for a project link.
+
+    Known boards map to ``host:project-id``; other links drop the scheme,
+    ``www.``, query string, fragment and trailing slash.
+    """
+    parts = urlsplit(link.strip())
+    host = _host(parts.netloc)
+    pattern = PROJECT_ID_PATTERNS.get(host)
+    if pattern is not None:
+        match = pattern.search(parts.path)
+        if match:
+            return f"{host}:{match.group(1).lower()}"
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def link_key(link: str) -> int:
+    """Return a signed 64-bit key of the canonical link (fits SQLite INTEGER)."""
+    digest = hashlib.blake2b(canonical_link(link).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
@@ -0,0 +1,96 @@
+import hashlib
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over include and exclude words.
+
+    The whole text is scanned once regardless of how many keywords there are,
+    instead of one substring search per keyword.
+    """
+
+    def __init__(self, include: Iterable[str], exclude: Iterable[str] = (), version: int = 0):
+        self.include: Tuple[str, ...] = tuple(_normalize(include))
+        self.exclude: Tuple[str, ...] = tuple(_normalize(exclude))
+        self.version = version
+        # Identifies the word set, e.g. to invalidate caches keyed on the filter
+        self.fingerprint = hashlib.sha1(
+            ("\n".join(self.include) + "\0" + "\n".join(self.exclude)).encode("utf-8")
+        ).hexdigest()
+        # Pattern ids: include words first, then exclude words
+        self._patterns = self.include + self.exclude
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+        for index, word in enumerate(self._patterns):
+            self._add(word, index)
+        self._link()
+
+    def _add(self, word: str, index: int) -> None:
+        node = 0
+        for char in word:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] += (index,)
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+    def scan(self, text: str, stop_on_exclude: bool = False) -> Tuple[List[str], List[str]]:
+        """Return (include words, exclude words) found in the text, in order of appearance."""
+        goto, fail, out = self._goto, self._fail, self._out
+        boundary = len(self.include)
+        found = set()
+        included: List[str] = []
+        excluded: List[str] = []
+        node = 0
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                if index in found:
+                    continue
+                found.add(index)
+                if index < boundary:
+                    included.append(self._patterns[index])
+                else:
+                    excluded.append(self._patterns[index])
+                    if stop_on_exclude:
+                        return included, excluded
+        return included, excluded
+
+    def match(self, text: str) -> Optional[List[str]]:
+        """Return matched keywords if the text passes the filter, otherwise None."""
+        included, excluded = self.scan(text, stop_on_exclude=True)
+        if excluded or not included:
+            return None
+        return included
+
+
+def _normalize(words: Iterable[str]) -> List[str]:
+    seen = set()
+    result = []
+    for word in words:
+        word = word.strip().lower()
+        if word and word not in seen:
+            seen.add(word)
+            result.append(word)
+    return result
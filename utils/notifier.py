@@ -1,15 +1,55 @@
+import asyncio
 import logging
 import html
-from typing import Optional
+import random
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 from telegram import Bot as TelegramBot
+from telegram.error import RetryAfter
 from telegram.ext import Application
-from config import TELEGRAM_TOKEN, TELEGRAM_CHAT_ID
-from utils import storage
+from config import (
+    TELEGRAM_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_RATE_GLOBAL,
+    TELEGRAM_RATE_PER_CHAT,
+    NOTIFY_WORKERS,
+    NOTIFY_DIGEST,
+    NOTIFY_DIGEST_WINDOW,
+    OUTBOX_RETRY_BASE,
+    OUTBOX_RETRY_MAX,
+    OUTBOX_MAX_ATTEMPTS,
+)
+from utils import async_storage, seen_links
+from utils.links import link_key
+from utils.rate_limit import TokenBucket
 
 logger = logging.getLogger(__name__)
-_sent_links = storage.load_sent_links()
 _application: Optional[Application] = None
 
+# Telegram limits: about 30 messages per second per bot and about one per
+# second in a single chat. Each send takes a token from both buckets.
+_global_bucket = TokenBucket(TELEGRAM_RATE_GLOBAL, TELEGRAM_RATE_GLOBAL)
+_chat_buckets: Dict[Any, TokenBucket] = {}
+
+# Outbox entry handed to a worker: (link key, project, failed attempts)
+OutboxItem = Tuple[int, Dict, int]
+
+# How often the dispatcher looks at the outbox when nothing wakes it up
+OUTBOX_POLL_INTERVAL = 60.0
+
+# Matched projects are stored in the durable outbox first; the dispatcher
+# moves due entries to this queue and the workers send them at the allowed rate.
+# ``None`` in the queue tells a worker to stop.
+_queue: Optional[asyncio.Queue] = None
+_wakeup: Optional[asyncio.Event] = None
+# Set by the dispatcher when a scan finds no due entries
+_idle: Optional[asyncio.Event] = None
+# Bumped on every enqueue, so a scan that started earlier cannot report idle
+_generation = 0
+_stopping = False
+_dispatcher_task: Optional[asyncio.Task] = None
+_workers: List[asyncio.Task] = []
+_queued: Set[int] = set()
 
 def set_application(app: Application) -> None:
     """Set the application instance to use for sending messages."""
@@ -26,12 +66,44 @@ def _get_bot() -> TelegramBot:
         return TelegramBot(TELEGRAM_TOKEN)
     return _application.bot
 
+def _chat_bucket(chat_id: Any) -> TokenBucket:
+    bucket = _chat_buckets.get(chat_id)
+    if bucket is None:
+        bucket = _chat_buckets[chat_id] = TokenBucket(TELEGRAM_RATE_PER_CHAT)
+    return bucket
+
+
+def _retry_after_seconds(error: RetryAfter) -> float:
+    # python-telegram-bot reports an int, newer versions may use timedelta
+    value = error.retry_after
+    return value.total_seconds() if hasattr(value, "total_seconds") else float(value)
+
+
+async def _send(chat_id: Any, text: str, **kwargs: Any) -> None:
+    """Send a message within Telegram's rate limits.
+
+    On RetryAfter both buckets are blocked for exactly the time Telegram asked
+    for, so the other workers wait as well, and the message is sent again.
+    """
+    chat_bucket = _chat_bucket(chat_id)
+    while True:
+        await chat_bucket.acquire()
+        await _global_bucket.acquire()
+        try:
+            await _get_bot().send_message(chat_id=chat_id, text=text, **kwargs)
+            return
+        except RetryAfter as e:
+            delay = _retry_after_seconds(e)
+            logger.warning(f"Telegram просит подождать {delay:.0f} с перед отправкой")
+            _global_bucket.block(delay)
+            chat_bucket.block(delay)
+
+
 async def notify_start() -> None:
     """Send a bot-started notification."""
     if TELEGRAM_CHAT_ID:
         try:
-            bot = _get_bot()
-            await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text="🤖 Бот запущен")
+            await _send(TELEGRAM_CHAT_ID, "🤖 Бот запущен")
         except Exception as e:
             logger.error(f"Ошибка при отправке уведомления о старте: {e}")
 
@@ -39,47 +111,322 @@ async def notify_stop() -> None:
     """Send a bot-stopped notification."""
     if TELEGRAM_CHAT_ID:
         try:
-            bot = _get_bot()
-            await bot.send_message(chat_id=TELEGRAM_CHAT_ID, text="⏹️ Бот остановлен")
+            await _send(TELEGRAM_CHAT_ID, "⏹️ Бот остановлен")
         except Exception as e:
             logger.error(f"Ошибка при отправке уведомления об остановке: {e}")
 
-async def notify_user(project):
-    """Отправляет уведомление о новом проекте в Telegram"""
+FOOTER = (
+    "💬 Для управления ключевыми словами используйте команды:\n"
+    "/addkeyword - добавить ключевое слово\n"
+    "/removekeyword - удалить ключевое слово\n"
+    "/list - показать список ключевых слов"
+)
+
+# Telegram message length limit and the description length kept in a digest
+MESSAGE_LIMIT = 4096
+DIGEST_DESCRIPTION_CHARS = 300
+# Caps for the other fields, measured after HTML escaping
+TITLE_CHARS = 200
+LINK_CHARS = 1000
+KEYWORDS_CHARS = 300
+# A project block plus the footer always fits into one message
+BLOCK_LIMIT = MESSAGE_LIMIT - len(FOOTER) - 2
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _escape(text: str, limit: int) -> str:
+    """HTML-escape text, shortening it until the escaped form fits into limit."""
+    escaped = html.escape(text)
+    while len(escaped) > limit:
+        text = _shorten(text, max(1, len(text) * limit // len(escaped)))
+        escaped = html.escape(text)
+    return escaped
+
+
+def _format_project(project: Dict, description_limit: Optional[int] = None) -> str:
+    """Project block without the footer, at most BLOCK_LIMIT characters.
+
+    Every field is capped, and the description gets whatever room is left.
+    """
+    description = project['description']
+    if description_limit is not None:
+        description = _shorten(description, description_limit)
+    link = html.escape(project['link'])
+    link_line = (
+        f"🔗 <a href=\"{link}\">Ссылка на заказ</a>\n" if len(link) <= LINK_CHARS
+        # Such a link is broken anyway; show its start instead of a huge href
+        else f"🔗 {_escape(project['link'], LINK_CHARS)}\n"
+    )
+    matched = project.get('keywords')
+    keywords_line = (
+        f"<b>🏷 Ключевые слова:</b> {_escape(', '.join(matched), KEYWORDS_CHARS)}\n" if matched else ""
+    )
+    head = f"<b>🔹 Новый заказ:</b> {_escape(project['title'], TITLE_CHARS)}\n{link_line}"
+    description_prefix = "<b>📝 Описание:</b> "
+    room = BLOCK_LIMIT - len(head) - len(description_prefix) - 1 - len(keywords_line)
+    return f"{head}{description_prefix}{_escape(description, room)}\n{keywords_line}"
+
+
+def build_digest(projects: List[Dict]) -> List[Tuple[str, List[Dict]]]:
+    """Pack projects into HTML messages of at most MESSAGE_LIMIT characters.
+
+    Returns (text, projects) pairs; only the last message carries the footer.
+    """
+    blocks = [(_format_project(p, DIGEST_DESCRIPTION_CHARS), p) for p in projects]
+    # Every message leaves room for the footer, so whichever is last can take it
+    messages: List[Tuple[str, List[Dict]]] = []
+    text, batch = "", []
+    for block, project in blocks:
+        if batch and len(text) + len(block) + 1 > BLOCK_LIMIT:
+            messages.append((text, batch))
+            text, batch = "", []
+        text = f"{text}\n{block}" if text else block
+        batch.append(project)
+    if batch:
+        messages.append((text, batch))
+    if messages:
+        last_text, last_batch = messages[-1]
+        messages[-1] = (f"{last_text}\n{FOOTER}", last_batch)
+    return messages
+
+
+async def notify_user(project) -> bool:
+    """Отправляет уведомление о новом проекте в Telegram.
+
+    Возвращает False, если проект уже отправлялся или отправка не настроена.
+    """
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         logger.error("Ошибка: Не указаны токен или chat_id для Telegram")
-        return
+        return False
 
     link = project.get('link')
-    if link in _sent_links:
+    if await async_storage.run(seen_links.is_seen, link):
         logger.info(f"Ссылка уже отправлена: {link}")
-        return
+        return False
 
-    title = html.escape(project['title'])
-    description = html.escape(project['description'])
-
-    message = (
-        f"<b>🔹 Новый заказ:</b> {title}\n"
-        f"🔗 <a href=\"{project['link']}\">Ссылка на заказ</a>\n"
-        f"<b>📝 Описание:</b> {description}\n\n"
-        f"💬 Для управления ключевыми словами используйте команды:\n"
-        "/addkeyword - добавить ключевое слово\n"
-        "/removekeyword - удалить ключевое слово\n"
-        "/list - показать список ключевых слов"
-    )
+    message = f"{_format_project(project)}\n{FOOTER}"
     
     try:
-        bot = _get_bot()
-        await bot.send_message(
-            chat_id=TELEGRAM_CHAT_ID,
-            text=message,
+        await _send(
+            TELEGRAM_CHAT_ID,
+            message,
             parse_mode="HTML",
             disable_web_page_preview=True
         )
         logger.info(f"Уведомление отправлено: {project['title']}")
-        _sent_links.add(link)
-        storage.save_sent_link(link)
+        await async_storage.run(seen_links.mark_seen, link, project.get('source'))
+        return True
 
     except Exception as e:
         logger.error(f"Ошибка при отправке сообщения: {e}")
         raise
+
+
+async def notify_digest(projects: List[Dict]) -> List[Dict]:
+    """Отправляет несколько проектов сводкой: по одному сообщению на 4096 символов.
+
+    Возвращает проекты, которые больше не нужно отправлять: доставленные и
+    отправленные раньше. Ошибка одного сообщения не мешает отправке остальных.
+    """
+    if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
+        logger.error("Ошибка: Не указаны токен или chat_id для Telegram")
+        return []
+
+    done, fresh = [], []
+    for project in projects:
+        if await async_storage.run(seen_links.is_seen, project.get('link')):
+            logger.info(f"Ссылка уже отправлена: {project.get('link')}")
+            done.append(project)
+        else:
+            fresh.append(project)
+
+    for text, batch in build_digest(fresh):
+        try:
+            await _send(TELEGRAM_CHAT_ID, text, parse_mode="HTML", disable_web_page_preview=True)
+        except Exception as e:
+            logger.error(f"Ошибка при отправке сводки: {e}")
+            continue
+        logger.info(f"Сводка отправлена: {len(batch)} заказов")
+        for project in batch:
+            await async_storage.run(seen_links.mark_seen, project['link'], project.get('source'))
+        done.extend(batch)
+    return done
+
+
+async def enqueue_projects(projects: List[Dict]) -> int:
+    """Store projects in the outbox in one transaction and wake the dispatcher.
+
+    Return how many projects are new, i.e. not sent or queued before.
+    Without running workers (tests, one-off runs) the projects are sent right away.
+    """
+    global _generation
+    if _queue is None:
+        sent = 0
+        for project in projects:
+            try:
+                sent += await notify_user(project)
+            except Exception as e:
+                logger.error(f"Ошибка при отправке уведомления: {e}")
+        return sent
+    added = await async_storage.enqueue_outbox(projects)
+    if added:
+        _generation += 1
+        _idle.clear()
+        _wakeup.set()
+    return added
+
+
+async def _dispatcher() -> None:
+    """Move due outbox entries to the in-memory queue for the workers."""
+    assert _queue is not None
+    while not _stopping:
+        _wakeup.clear()
+        generation = _generation
+        due = await async_storage.due_outbox()
+        for key, project, attempts in due:
+            # An entry being delivered is still in the outbox: do not hand it out twice
+            if key not in _queued:
+                _queued.add(key)
+                await _queue.put((key, project, attempts))
+        if due or generation != _generation:
+            _idle.clear()
+        else:
+            _idle.set()
+        next_at = await async_storage.next_outbox_attempt()
+        timeout = OUTBOX_POLL_INTERVAL if next_at is None else min(next_at - time.time(), OUTBOX_POLL_INTERVAL)
+        try:
+            await asyncio.wait_for(_wakeup.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _collect(window: float) -> Tuple[List[OutboxItem], bool]:
+    """Wait for an entry, then keep taking entries for ``window`` seconds.
+
+    The flag is true once the worker has taken its stop marker.
+    """
+    assert _queue is not None
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + window
+    batch: List[OutboxItem] = []
+    item = await _queue.get()
+    while item is not None:
+        batch.append(item)
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            return batch, False
+        try:
+            item = await asyncio.wait_for(_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return batch, False
+    _queue.task_done()
+    return batch, True
+
+
+async def _retry(key: int, attempts: int, error: Optional[str]) -> None:
+    if attempts >= OUTBOX_MAX_ATTEMPTS:
+        logger.error(f"Уведомление не доставлено после {attempts} попыток, удаляю из очереди: {error}")
+        await async_storage.complete_outbox([key])
+        return
+    # Exponential backoff with jitter so that failed entries do not retry in lockstep
+    delay = min(OUTBOX_RETRY_BASE * 2 ** (attempts - 1), OUTBOX_RETRY_MAX) * random.uniform(0.8, 1.2)
+    await async_storage.retry_outbox(key, attempts, time.time() + delay, error)
+
+
+async def _deliver(batch: List[OutboxItem], digest: bool) -> None:
+    error = None
+    if digest:
+        done = await notify_digest([project for _, project, _ in batch])
+        delivered = {link_key(project['link']) for project in done}
+        error = "сводка не отправлена"
+    else:
+        key, project, _ = batch[0]
+        try:
+            await notify_user(project)
+            delivered = {key}
+        except Exception as e:
+            delivered, error = set(), str(e)
+    await async_storage.complete_outbox(delivered)
+    for key, _, attempts in batch:
+        if key not in delivered:
+            await _retry(key, attempts + 1, error)
+
+
+async def _worker(digest: bool) -> None:
+    assert _queue is not None
+    while True:
+        batch, stop = await _collect(NOTIFY_DIGEST_WINDOW if digest else 0)
+        if batch:
+            try:
+                await _deliver(batch, digest)
+            except Exception as e:
+                logger.error(f"Ошибка при отправке уведомления: {e}")
+            finally:
+                for key, _, _ in batch:
+                    _queued.discard(key)
+                    _queue.task_done()
+                # Let the dispatcher rescan: the entries are gone or rescheduled
+                _wakeup.set()
+        if stop or _queue.empty():
+            # Queue drained: write the links sent in this burst in one transaction
+            await async_storage.flush_sent_links()
+        if stop:
+            return
+
+
+def start_workers(count: int = NOTIFY_WORKERS, digest: bool = NOTIFY_DIGEST) -> None:
+    """Start the outbox dispatcher and notification workers in the running loop.
+
+    Entries left in the outbox by a previous run are delivered first. In
+    digest mode a single worker collects entries for NOTIFY_DIGEST_WINDOW
+    seconds and sends them as one message.
+    """
+    global _queue, _wakeup, _idle, _stopping, _dispatcher_task
+    if _queue is not None:
+        return
+    _queue = asyncio.Queue()
+    _wakeup = asyncio.Event()
+    _idle = asyncio.Event()
+    _stopping = False
+    count = 1 if digest else max(count, 1)
+    _dispatcher_task = asyncio.create_task(_dispatcher())
+    _workers.extend(asyncio.create_task(_worker(digest)) for _ in range(count))
+
+
+async def wait_notifications() -> None:
+    """Wait until no outbox entry is due or being delivered."""
+    if _idle is not None:
+        await _idle.wait()
+
+
+async def stop_workers(timeout: Optional[float] = None) -> None:
+    """Give due notifications ``timeout`` seconds, then stop the workers.
+
+    The dispatcher stops on a flag and each worker on a ``None`` marker after
+    the entries already queued; only workers still busy after ``timeout`` are
+    cancelled. Undelivered entries stay in the outbox for the next start.
+    """
+    global _queue, _stopping, _dispatcher_task
+    if _queue is None:
+        return
+    try:
+        await asyncio.wait_for(wait_notifications(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Не все уведомления отправлены, они останутся в очереди до следующего запуска")
+    _stopping = True
+    _wakeup.set()
+    await _dispatcher_task
+    for _ in _workers:
+        _queue.put_nowait(None)
+    _, pending = await asyncio.wait(_workers, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    _workers.clear()
+    _queued.clear()
+    _dispatcher_task = None
+    _queue = None
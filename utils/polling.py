@@ -0,0 +1,36 @@
+from config import PARSING_INTERVAL, POLL_INTERVAL_MIN, POLL_INTERVAL_MAX
+
+
+class AdaptivePollInterval:
+    """Polling interval of one source that follows how often it has new matches.
+
+    A run that found matches divides the interval by ``speedup``; a quiet run
+    multiplies it by ``slowdown``. The interval stays within
+    ``[minimum, maximum]`` minutes, so busy boards are polled often and quiet
+    ones cost fewer requests.
+    """
+
+    def __init__(
+        self,
+        initial: float = PARSING_INTERVAL,
+        minimum: float = POLL_INTERVAL_MIN,
+        maximum: float = POLL_INTERVAL_MAX,
+        speedup: float = 2.0,
+        slowdown: float = 1.5,
+    ):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.speedup = speedup
+        self.slowdown = slowdown
+        self.minutes = self._clamp(initial)
+
+    def _clamp(self, minutes: float) -> float:
+        return min(max(minutes, self.minimum), self.maximum)
+
+    def update(self, found: int) -> float:
+        """Record how many new matches a run found and return the next interval."""
+        if found:
+            self.minutes = self._clamp(self.minutes / self.speedup)
+        else:
+            self.minutes = self._clamp(self.minutes * self.slowdown)
+        return self.minutes
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+from config import (
+    RATE_LIMIT_INITIAL,
+    RATE_LIMIT_MIN,
+    RATE_LIMIT_MAX,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_MAX_WAIT,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Сайт попросил паузу дольше, чем мы готовы ждать"""
+
+    def __init__(self, host: str, delay: float):
+        super().__init__(f"{host}: запросы ограничены еще на {delay:.0f} с")
+        self.host = host
+        self.delay = delay
+
+
+class TokenBucket:
+    """Ведро токенов на виртуальном расписании (GCRA).
+
+    Слот резервируется синхронно, а ждут его уже после резервирования, поэтому
+    ведру не нужна блокировка и его можно делить между циклами событий.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._clock = clock
+        self._tat = clock()  # теоретическое время появления следующего токена
+        self.blocked_until = 0.0
+
+    def delay(self) -> float:
+        """Сколько секунд ждать следующего токена, без резервирования"""
+        now = self._clock()
+        tolerance = (self.capacity - 1) / self.rate
+        wait = max(self._tat, now) - tolerance - now
+        return max(wait, self.blocked_until - now, 0.0)
+
+    def reserve(self) -> float:
+        """Резервирует токен и возвращает, сколько секунд его ждать"""
+        wait = self.delay()
+        now = self._clock()
+        self._tat = max(self._tat, now + wait) + 1 / self.rate
+        return wait
+
+    def block(self, seconds: float) -> None:
+        """Не выдает токены заданное число секунд"""
+        self.blocked_until = max(self.blocked_until, self._clock() + seconds)
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Переводит заголовок Retry-After (секунды или HTTP-дата) в секунды"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """Ведра токенов по хостам, скорость которых следует за ответами сайтов (AIMD).
+
+    Каждый успешный ответ увеличивает скорость хоста на ``increase`` запросов в
+    секунду, но не выше ``max_rate``; ответ 403/429/503 умножает её на
+    ``decrease``, но не ниже ``min_rate``, и выдерживает паузу из заголовка
+    ``Retry-After``, если сайт его прислал.
+    """
+
+    BACKOFF_STATUSES = (403, 429, 503)
+
+    def __init__(
+        self,
+        initial_rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: float = 1.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+        max_wait: float = 120.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.max_wait = max_wait
+        self._clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @staticmethod
+    def host_of(url_or_host: str) -> str:
+        if '://' in url_or_host:
+            return urlsplit(url_or_host).hostname or url_or_host
+        return url_or_host
+
+    def bucket(self, url_or_host: str) -> TokenBucket:
+        host = self.host_of(url_or_host)
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self.initial_rate, self.burst, self._clock)
+            self._buckets[host] = bucket
+        return bucket
+
+    def delay(self, url_or_host: str) -> float:
+        return self.bucket(url_or_host).delay()
+
+    async def acquire(self, url_or_host: str) -> None:
+        """Ждет следующего слота хоста или выбрасывает исключение, если пауза слишком долгая"""
+        bucket = self.bucket(url_or_host)
+        wait = bucket.delay()
+        if wait > self.max_wait:
+            raise RateLimitExceeded(self.host_of(url_or_host), wait)
+        await bucket.acquire()
+
+    def record(self, url_or_host: str, status: int, retry_after: Optional[str] = None) -> None:
+        """Подстраивает скорость хоста под статус завершенного запроса"""
+        bucket = self.bucket(url_or_host)
+        if 200 <= status < 400:
+            bucket.rate = min(bucket.rate + self.increase, self.max_rate)
+        elif status in self.BACKOFF_STATUSES:
+            bucket.rate = max(bucket.rate * self.decrease, self.min_rate)
+            pause = parse_retry_after(retry_after)
+            if pause is None:
+                pause = 1 / bucket.rate
+            bucket.block(pause)
+            logger.warning(
+                "Сайт %s ответил %s, скорость снижена до %.2f запр/с, пауза %.0f с",
+                self.host_of(url_or_host), status, bucket.rate, pause,
+            )
+
+
+_limiter: Optional[AdaptiveRateLimiter] = None
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Возвращает ограничитель, общий для всех парсеров процесса"""
+    global _limiter
+    if _limiter is None:
+        _limiter = AdaptiveRateLimiter(
+            RATE_LIMIT_INITIAL,
+            RATE_LIMIT_MIN,
+            RATE_LIMIT_MAX,
+            burst=RATE_LIMIT_BURST,
+            max_wait=RATE_LIMIT_MAX_WAIT,
+        )
+    return _limiter
@@ -0,0 +1,170 @@
+import hashlib
+import logging
+import math
+import mmap
+import struct
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from config import SEEN_LINKS_CAPACITY, SEEN_LINKS_ERROR_RATE
+from utils import storage
+from utils.links import link_key
+
+logger = logging.getLogger(__name__)
+
+# magic, number of bits, capacity, number of hashes, links added
+_HEADER = struct.Struct("<8sQQIQ")
+_MAGIC = b"SEENBLM2"
+
+
+def _positions(key: int, bits: int, hashes: int) -> Iterator[int]:
+    # Double hashing: k positions from two 64-bit halves of one digest
+    digest = hashlib.blake2b(key.to_bytes(8, "little", signed=True), digest_size=16).digest()
+    h1, h2 = struct.unpack("<QQ", digest)
+    for i in range(hashes):
+        yield (h1 + i * h2) % bits
+
+
+class BloomFilter:
+    """Bloom filter stored in a memory-mapped file.
+
+    Holds 64-bit link keys (see utils.links). Membership answers are
+    "definitely not seen" or "maybe seen"; only the pages of the file that are
+    touched stay in memory.
+    """
+
+    def __init__(self, path: Path, capacity: int, error_rate: float):
+        self.path = Path(path)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.bits = max(8, bits)
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.capacity = capacity
+        size = _HEADER.size + (self.bits + 7) // 8
+        with open(self.path, "wb") as f:
+            f.truncate(size)
+        self._open()
+        _HEADER.pack_into(self._map, 0, _MAGIC, self.bits, self.capacity, self.hashes, 0)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["BloomFilter"]:
+        """Open an existing filter file, or return None if it is missing or damaged."""
+        path = Path(path)
+        try:
+            with open(path, "rb") as f:
+                header = f.read(_HEADER.size)
+            magic, bits, capacity, hashes, _ = _HEADER.unpack(header)
+            if magic != _MAGIC or path.stat().st_size != _HEADER.size + (bits + 7) // 8:
+                return None
+        except (OSError, struct.error):
+            return None
+        self = cls.__new__(cls)
+        self.path, self.bits, self.capacity, self.hashes = path, bits, capacity, hashes
+        self._open()
+        return self
+
+    def _open(self) -> None:
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+
+    @property
+    def count(self) -> int:
+        return _HEADER.unpack_from(self._map, 0)[4]
+
+    def add(self, key: int) -> None:
+        for pos in _positions(key, self.bits, self.hashes):
+            index = _HEADER.size + pos // 8
+            self._map[index] |= 1 << (pos % 8)
+        struct.pack_into("<Q", self._map, _HEADER.size - 8, self.count + 1)
+
+    def __contains__(self, key: int) -> bool:
+        return all(
+            self._map[_HEADER.size + pos // 8] & (1 << (pos % 8))
+            for pos in _positions(key, self.bits, self.hashes)
+        )
+
+    def close(self) -> None:
+        try:
+            self._map.flush()
+            self._map.close()
+        finally:
+            self._file.close()
+
+
+class SeenLinks:
+    """Index of sent links: a Bloom filter in front of the ``sent_links`` table.
+
+    A miss in the filter means the link was never sent; a hit is confirmed
+    with a primary-key lookup, so false positives never drop a project.
+    """
+
+    def __init__(self, db_path: Path, capacity: int = SEEN_LINKS_CAPACITY,
+                 error_rate: float = SEEN_LINKS_ERROR_RATE):
+        self.db_path = Path(db_path)
+        self.path = self.db_path.with_suffix(".bloom")
+        self.error_rate = error_rate
+        stored = storage.count_sent_links()
+        bloom = BloomFilter.load(self.path)
+        # Bits are set before the row is written, so a filter that knows about
+        # fewer links than the table missed some of them and must be rebuilt
+        if bloom is None or bloom.count < stored or stored > bloom.capacity:
+            if bloom is not None:
+                bloom.close()
+            bloom = self._rebuild(max(capacity, stored * 2), storage.iter_sent_keys())
+        self._bloom = bloom
+
+    def _rebuild(self, capacity: int, keys: Iterable[int]) -> BloomFilter:
+        logger.info("Перестраиваю индекс отправленных ссылок (емкость %s)", capacity)
+        bloom = BloomFilter(self.path, capacity, self.error_rate)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def __contains__(self, link: str) -> bool:
+        key = link_key(link)
+        return key in self._bloom and storage.has_sent_key(key)
+
+    def add(self, link: str, source: Optional[str] = None) -> None:
+        """Remember a sent link in the filter and in the database."""
+        if self._bloom.count >= self._bloom.capacity:
+            # Rebuilt from live rows only: links removed by the retention policy
+            # free their space instead of growing the filter forever
+            capacity = max(self._bloom.capacity, storage.count_sent_links() * 2)
+            self._bloom.close()
+            self._bloom = self._rebuild(capacity, storage.iter_sent_keys())
+        self._bloom.add(link_key(link))
+        storage.save_sent_link(link, source)
+
+    def close(self) -> None:
+        self._bloom.close()
+
+
+_lock = threading.Lock()
+_index: Optional[SeenLinks] = None
+
+
+def get_index() -> SeenLinks:
+    """Return the index for the current database, opening it on first use."""
+    global _index
+    with _lock:
+        if _index is None or _index.db_path != Path(storage.DB_FILE):
+            if _index is not None:
+                _index.close()
+            _index = SeenLinks(storage.DB_FILE)
+        return _index
+
+
+def is_seen(link: str) -> bool:
+    return link in get_index()
+
+
+def mark_seen(link: str, source: Optional[str] = None) -> None:
+    get_index().add(link, source)
+
+
+def close() -> None:
+    global _index
+    with _lock:
+        if _index is not None:
+            _index.close()
+            _index = None
@@ -1,14 +1,50 @@
+import json
 import logging
+import re
+import functools
 import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Set
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+from config import SENT_LINKS_BATCH_SIZE, SENT_LINKS_FLUSH_INTERVAL
+from utils.links import link_key
 
 logger = logging.getLogger(__name__)
 
 DB_FILE = Path('sent_links.db')
 _conn: sqlite3.Connection | None = None
+# The connection is shared by the event loop thread (sync calls, tests) and the
+# storage thread used by utils.async_storage, so every call is serialized
+_lock = threading.RLock()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _locked(func: F) -> F:
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with _lock:
+            return func(*args, **kwargs)
+    return wrapper  # type: ignore[return-value]
+
+# WAL lets readers run alongside the writer; with synchronous=NORMAL a commit
+# no longer waits for fsync (the WAL is synced at checkpoints instead)
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+    "PRAGMA busy_timeout=5000",
+)
 
+# Sent links waiting for the next batched commit: key -> (first_seen, source)
+_pending_links: dict[int, Tuple[int, str | None]] = {}
+_pending_since: float | None = None
 
+
+@_locked
 def init(db_path: Path | str | None = None) -> None:
     """Initialize connection to the SQLite database."""
     global DB_FILE, _conn
@@ -16,18 +52,137 @@ def init(db_path: Path | str | None = None) -> None:
         DB_FILE = Path(db_path)
     if _conn is not None:
         try:
+            flush_sent_links()
             _conn.close()
         except Exception:
             pass
         _conn = None
-    _conn = sqlite3.connect(DB_FILE)
+    _pending_links.clear()
+    _conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    for pragma in _PRAGMAS:
+        _conn.execute(pragma)
     _conn.execute(
         "CREATE TABLE IF NOT EXISTS sent_links (link TEXT PRIMARY KEY)"
     )
     _conn.execute(
         "CREATE TABLE IF NOT EXISTS keywords (word TEXT PRIMARY KEY, type TEXT NOT NULL)"
     )
+    _conn.execute(
+        "CREATE TABLE IF NOT EXISTS http_cache ("
+        "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+        "body_hash TEXT, variant TEXT)"
+    )
+    _conn.execute(
+        "CREATE TABLE IF NOT EXISTS crawl_marks (source TEXT PRIMARY KEY, links TEXT NOT NULL)"
+    )
     _conn.commit()
+    _migrate(_conn)
+
+
+def _add_sent_link_metadata(conn: sqlite3.Connection) -> None:
+    # Links stored before the migration count as first seen now, so they are
+    # kept for a full retention period instead of being pruned at once
+    conn.execute("ALTER TABLE sent_links ADD COLUMN first_seen INTEGER")
+    conn.execute("ALTER TABLE sent_links ADD COLUMN source TEXT")
+    conn.execute("UPDATE sent_links SET first_seen=?", (int(time.time()),))
+    conn.execute("CREATE INDEX IF NOT EXISTS sent_links_first_seen ON sent_links(first_seen)")
+
+
+def _key_sent_links(conn: sqlite3.Connection) -> None:
+    # Rows are keyed by the 64-bit hash of the canonical link (see utils.links):
+    # an INTEGER PRIMARY KEY is the rowid itself, so the table needs no
+    # separate text index and the same project under another URL is one row
+    conn.execute(
+        "CREATE TABLE sent_links_keyed (key INTEGER PRIMARY KEY, first_seen INTEGER, source TEXT)"
+    )
+    rows = conn.execute("SELECT link, first_seen, source FROM sent_links")
+    conn.executemany(
+        "INSERT OR IGNORE INTO sent_links_keyed(key, first_seen, source) VALUES (?, ?, ?)",
+        ((link_key(link), first_seen, source) for link, first_seen, source in rows),
+    )
+    conn.execute("DROP TABLE sent_links")
+    conn.execute("ALTER TABLE sent_links_keyed RENAME TO sent_links")
+    conn.execute("CREATE INDEX sent_links_first_seen ON sent_links(first_seen)")
+
+
+def _add_project_archive(conn: sqlite3.Connection) -> None:
+    # Every parsed project, keyed like sent_links. projects_fts is an
+    # external-content FTS5 index over title and description kept in sync by
+    # triggers, so the text is stored only once
+    conn.execute(
+        "CREATE TABLE projects ("
+        "key INTEGER PRIMARY KEY, link TEXT NOT NULL, title TEXT NOT NULL, "
+        "description TEXT NOT NULL, price TEXT, source TEXT, "
+        "first_seen INTEGER NOT NULL, last_seen INTEGER NOT NULL)"
+    )
+    conn.execute("CREATE INDEX projects_last_seen ON projects(last_seen)")
+    conn.execute(
+        "CREATE VIRTUAL TABLE projects_fts USING fts5("
+        "title, description, content='projects', content_rowid='key', "
+        "tokenize='unicode61 remove_diacritics 2')"
+    )
+    conn.execute(
+        "CREATE TRIGGER projects_ai AFTER INSERT ON projects BEGIN "
+        "INSERT INTO projects_fts(rowid, title, description) "
+        "VALUES (new.key, new.title, new.description); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER projects_ad AFTER DELETE ON projects BEGIN "
+        "INSERT INTO projects_fts(projects_fts, rowid, title, description) "
+        "VALUES ('delete', old.key, old.title, old.description); END"
+    )
+    conn.execute(
+        "CREATE TRIGGER projects_au AFTER UPDATE OF title, description ON projects BEGIN "
+        "INSERT INTO projects_fts(projects_fts, rowid, title, description) "
+        "VALUES ('delete', old.key, old.title, old.description); "
+        "INSERT INTO projects_fts(rowid, title, description) "
+        "VALUES (new.key, new.title, new.description); END"
+    )
+
+
+def _add_outbox(conn: sqlite3.Connection) -> None:
+    # Matched projects waiting for delivery; a row is deleted once Telegram
+    # accepted the message, so pending notifications survive a restart
+    conn.execute(
+        "CREATE TABLE outbox ("
+        "key INTEGER PRIMARY KEY, project TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+        "next_attempt REAL NOT NULL, created REAL NOT NULL, last_error TEXT)"
+    )
+    conn.execute("CREATE INDEX outbox_next_attempt ON outbox(next_attempt)")
+
+
+def _add_source_health(conn: sqlite3.Connection) -> None:
+    # Circuit breaker state of each source: consecutive failed checks and the
+    # time until which the source is not checked
+    conn.execute(
+        "CREATE TABLE source_health ("
+        "source TEXT PRIMARY KEY, failures INTEGER NOT NULL, opened_until REAL NOT NULL)"
+    )
+
+
+# Schema migrations; PRAGMA user_version holds the number already applied
+_MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _add_sent_link_metadata,
+    _key_sent_links,
+    _add_project_archive,
+    _add_outbox,
+    _add_source_health,
+]
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, migration in enumerate(_MIGRATIONS[version:], start=version + 1):
+        # Explicit BEGIN so that DDL and the version bump commit together
+        conn.execute("BEGIN")
+        try:
+            migration(conn)
+            conn.execute(f"PRAGMA user_version={number}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info("Схема базы обновлена до версии %s", number)
 
 
 def _get_conn() -> sqlite3.Connection:
@@ -37,26 +192,263 @@ def _get_conn() -> sqlite3.Connection:
     return _conn
 
 
-def load_sent_links() -> Set[str]:
-    """Return a set of previously sent links."""
+@_locked
+def has_sent_link(link: str) -> bool:
+    """Return True if the link (or another URL of the same project) has already been sent."""
+    return has_sent_key(link_key(link))
+
+
+@_locked
+def has_sent_key(key: int) -> bool:
+    """Return True if a link with this key (see utils.links.link_key) has been sent."""
+    if key in _pending_links:
+        return True
     conn = _get_conn()
-    cur = conn.execute("SELECT link FROM sent_links")
-    return {row[0] for row in cur.fetchall()}
+    cur = conn.execute("SELECT 1 FROM sent_links WHERE key=?", (key,))
+    return cur.fetchone() is not None
 
 
-def save_sent_link(link: str) -> None:
-    """Persist a new sent link if it's not already stored."""
+@_locked
+def count_sent_links() -> int:
+    """Return the number of stored sent links."""
+    flush_sent_links()
+    conn = _get_conn()
+    return conn.execute("SELECT COUNT(*) FROM sent_links").fetchone()[0]
+
+
+def iter_sent_keys(batch_size: int = 1000) -> Iterator[int]:
+    """Yield keys of stored sent links without loading the whole table into memory."""
+    with _lock:
+        flush_sent_links()
+        cur = _get_conn().execute("SELECT key FROM sent_links")
+    while True:
+        with _lock:
+            rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        for row in rows:
+            yield row[0]
+
+
+@_locked
+def save_sent_link(link: str, source: str | None = None) -> None:
+    """Queue a sent link for the next batched commit.
+
+    The batch is written when it reaches SENT_LINKS_BATCH_SIZE links, when its
+    oldest link is older than SENT_LINKS_FLUSH_INTERVAL seconds, or when
+    flush_sent_links() is called at the end of a cycle.
+    """
+    global _pending_since
+    if not _pending_links:
+        _pending_since = time.monotonic()
+    _pending_links.setdefault(link_key(link), (int(time.time()), source))
+    if (
+        len(_pending_links) >= SENT_LINKS_BATCH_SIZE
+        or time.monotonic() - _pending_since >= SENT_LINKS_FLUSH_INTERVAL
+    ):
+        flush_sent_links()
+
+
+@_locked
+def save_sent_links(links: Iterable[str], source: str | None = None) -> None:
+    """Persist many sent links in a single transaction."""
+    now = int(time.time())
+    for link in links:
+        _pending_links.setdefault(link_key(link), (now, source))
+    flush_sent_links()
+
+
+@_locked
+def flush_sent_links() -> None:
+    """Write queued sent links in one transaction."""
+    global _pending_since
+    if not _pending_links:
+        return
     conn = _get_conn()
     try:
-        conn.execute(
-            "INSERT OR IGNORE INTO sent_links(link) VALUES (?)",
-            (link,),
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO sent_links(key, first_seen, source) VALUES (?, ?, ?)",
+                ((key, first_seen, source) for key, (first_seen, source) in _pending_links.items()),
+            )
+        _pending_links.clear()
+        _pending_since = None
+    except Exception:
+        logger.warning("Не удалось сохранить отправленные ссылки")
+
+
+@_locked
+def prune_sent_links(max_age_days: float) -> int:
+    """Delete sent links first seen more than ``max_age_days`` ago; return how many."""
+    flush_sent_links()
+    cutoff = int(time.time() - max_age_days * 86400)
+    conn = _get_conn()
+    with conn:
+        cur = conn.execute("DELETE FROM sent_links WHERE first_seen < ?", (cutoff,))
+    return cur.rowcount
+
+
+@_locked
+def prune_projects(max_age_days: float) -> int:
+    """Delete archived projects not seen for ``max_age_days``; return how many."""
+    cutoff = int(time.time() - max_age_days * 86400)
+    conn = _get_conn()
+    with conn:
+        cur = conn.execute("DELETE FROM projects WHERE last_seen < ?", (cutoff,))
+    return cur.rowcount
+
+
+@_locked
+def maintain(retention_days: float = 0, archive_days: float = 0) -> None:
+    """Apply the retention policy, then refresh statistics and compact the file.
+
+    ``retention_days`` of 0 keeps every sent link, ``archive_days`` of 0 keeps
+    every archived project.
+    """
+    conn = _get_conn()
+    pruned = prune_sent_links(retention_days) if retention_days > 0 else 0
+    archived = prune_projects(archive_days) if archive_days > 0 else 0
+    with conn:
+        conn.execute("INSERT INTO projects_fts(projects_fts) VALUES ('optimize')")
+    conn.execute("ANALYZE")
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    logger.info(
+        "Обслуживание базы завершено, удалено старых ссылок: %s, заказов из архива: %s",
+        pruned, archived,
+    )
+
+
+@_locked
+def archive_projects(projects: Iterable[dict], source: str | None = None) -> None:
+    """Store parsed projects in the searchable archive in one transaction.
+
+    Projects seen before keep their first_seen time and get last_seen updated.
+    Their text is rewritten only when it changed, so the full-text index is
+    not rebuilt for every card on every crawl.
+    """
+    now = int(time.time())
+    rows = [
+        (
+            link_key(project['link']), project['link'], project.get('title', ''),
+            project.get('description', ''), project.get('price'),
+            project.get('source') or source, now, now,
         )
-        conn.commit()
+        for project in projects
+        if project.get('link')
+    ]
+    if not rows:
+        return
+    conn = _get_conn()
+    try:
+        with conn:
+            conn.executemany(
+                "INSERT INTO projects(key, link, title, description, price, source, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET link=excluded.link, title=excluded.title, "
+                "description=excluded.description, price=excluded.price, last_seen=excluded.last_seen "
+                "WHERE link IS NOT excluded.link OR title IS NOT excluded.title "
+                "OR description IS NOT excluded.description OR price IS NOT excluded.price",
+                rows,
+            )
+            # Unchanged rows only get last_seen, which the FTS triggers ignore
+            conn.executemany(
+                "UPDATE projects SET last_seen=? WHERE key=? AND last_seen<?",
+                [(row[7], row[0], row[7]) for row in rows],
+            )
     except Exception:
-        logger.warning("Не удалось сохранить отправленную ссылку")
+        logger.warning("Не удалось сохранить заказы в архив")
+
+
+@_locked
+def enqueue_outbox(projects: Iterable[dict]) -> int:
+    """Add projects to the outbox in one transaction; return how many were new.
+
+    Projects already sent or already waiting in the outbox are skipped.
+    """
+    now = time.time()
+    rows = []
+    for project in projects:
+        if not project.get('link'):
+            continue
+        key = link_key(project['link'])
+        if not has_sent_key(key):
+            rows.append((key, json.dumps(project, ensure_ascii=False), now, now))
+    if not rows:
+        return 0
+    conn = _get_conn()
+    with conn:
+        cur = conn.executemany(
+            "INSERT OR IGNORE INTO outbox(key, project, next_attempt, created) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+    return cur.rowcount
+
+
+@_locked
+def due_outbox(limit: int = 100, now: float | None = None) -> List[Tuple[int, dict, int]]:
+    """Return (key, project, attempts) of outbox entries due for delivery, oldest first."""
+    cur = _get_conn().execute(
+        "SELECT key, project, attempts FROM outbox WHERE next_attempt <= ? "
+        "ORDER BY created LIMIT ?",
+        (time.time() if now is None else now, limit),
+    )
+    return [(key, json.loads(project), attempts) for key, project, attempts in cur.fetchall()]
 
 
+@_locked
+def next_outbox_attempt(after: float | None = None) -> float | None:
+    """Return the earliest retry time later than ``after`` (default: now), or None."""
+    return _get_conn().execute(
+        "SELECT MIN(next_attempt) FROM outbox WHERE next_attempt > ?",
+        (time.time() if after is None else after,),
+    ).fetchone()[0]
+
+
+@_locked
+def complete_outbox(keys: Iterable[int]) -> None:
+    """Remove delivered (or abandoned) entries from the outbox."""
+    conn = _get_conn()
+    with conn:
+        conn.executemany("DELETE FROM outbox WHERE key=?", ((key,) for key in keys))
+
+
+@_locked
+def retry_outbox(key: int, attempts: int, next_attempt: float, error: str | None = None) -> None:
+    """Record a failed delivery and when to try again."""
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            "UPDATE outbox SET attempts=?, next_attempt=?, last_error=? WHERE key=?",
+            (attempts, next_attempt, error, key),
+        )
+
+
+def _fts_query(text: str) -> str:
+    # Every word is quoted (user input never breaks FTS5 syntax) and matched as
+    # a prefix, so "верст" finds "верстка"
+    words = re.findall(r"\w+", text.lower())
+    return " ".join(f'"{word}"*' for word in words)
+
+
+@_locked
+def search_projects(text: str, limit: int = 10) -> List[dict]:
+    """Return archived projects matching all words of ``text``, best first."""
+    query = _fts_query(text)
+    if not query:
+        return []
+    conn = _get_conn()
+    cur = conn.execute(
+        "SELECT p.link, p.title, p.description, p.price, p.source, p.last_seen "
+        "FROM projects_fts JOIN projects p ON p.key = projects_fts.rowid "
+        "WHERE projects_fts MATCH ? ORDER BY rank, p.last_seen DESC LIMIT ?",
+        (query, limit),
+    )
+    columns = ("link", "title", "description", "price", "source", "last_seen")
+    return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+@_locked
 def load_keywords(include: bool = True) -> Set[str]:
     """Load stored keywords of the specified type."""
     conn = _get_conn()
@@ -67,6 +459,7 @@ def load_keywords(include: bool = True) -> Set[str]:
     return {row[0] for row in cur.fetchall()}
 
 
+@_locked
 def save_keyword(word: str, include: bool = True) -> None:
     """Save or update a keyword."""
     conn = _get_conn()
@@ -77,6 +470,7 @@ def save_keyword(word: str, include: bool = True) -> None:
     conn.commit()
 
 
+@_locked
 def delete_keyword(word: str, include: bool = True) -> None:
     """Delete a keyword from storage."""
     conn = _get_conn()
@@ -86,3 +480,83 @@ def delete_keyword(word: str, include: bool = True) -> None:
     )
     conn.commit()
 
+
+@_locked
+def load_http_validators(url: str) -> Optional[Tuple[str | None, str | None, str | None, str | None]]:
+    """Return (etag, last_modified, body_hash, variant) stored for a URL."""
+    conn = _get_conn()
+    cur = conn.execute(
+        "SELECT etag, last_modified, body_hash, variant FROM http_cache WHERE url=?",
+        (url,),
+    )
+    return cur.fetchone()
+
+
+@_locked
+def save_http_validators(
+    url: str,
+    etag: str | None,
+    last_modified: str | None,
+    body_hash: str | None,
+    variant: str | None = None,
+) -> None:
+    """Store HTTP cache validators and the body hash of the last response."""
+    conn = _get_conn()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO http_cache(url, etag, last_modified, body_hash, variant) "
+            "VALUES(?, ?, ?, ?, ?)",
+            (url, etag, last_modified, body_hash, variant),
+        )
+        conn.commit()
+    except Exception:
+        logger.warning("Не удалось сохранить HTTP-валидаторы для %s", url)
+
+
+@_locked
+def load_crawl_mark(source: str) -> List[str]:
+    """Return the links of the newest page seen by the previous crawl of a source."""
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT links FROM crawl_marks WHERE source=?", (source,)
+    ).fetchone()
+    if row is None:
+        return []
+    try:
+        return list(json.loads(row[0]))
+    except ValueError:
+        return []
+
+
+@_locked
+def save_crawl_mark(source: str, links: Iterable[str]) -> None:
+    """Remember the newest links of a source as its crawl high-water mark."""
+    conn = _get_conn()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO crawl_marks(source, links) VALUES(?, ?)",
+            (source, json.dumps(list(links), ensure_ascii=False)),
+        )
+        conn.commit()
+    except Exception:
+        logger.warning("Не удалось сохранить метку обхода для %s", source)
+
+
+@_locked
+def load_source_health(source: str) -> Tuple[int, float]:
+    """Return (consecutive failures, opened until) of a source's circuit breaker."""
+    row = _get_conn().execute(
+        "SELECT failures, opened_until FROM source_health WHERE source=?", (source,)
+    ).fetchone()
+    return (row[0], row[1]) if row else (0, 0.0)
+
+
+@_locked
+def save_source_health(source: str, failures: int, opened_until: float) -> None:
+    """Store the circuit breaker state of a source."""
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO source_health(source, failures, opened_until) VALUES (?, ?, ?)",
+            (source, failures, opened_until),
+        )
@@ -1,10 +1,19 @@
+import html
 import logging
+from datetime import datetime
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, ContextTypes, CallbackQueryHandler
 from telegram.request import HTTPXRequest
 from types import SimpleNamespace
 from config import TELEGRAM_TOKEN
-from .keywords import KEYWORDS, add_keyword, remove_keyword
+from . import async_storage, keywords
+from .keywords import add_keyword, remove_keyword
+
+# Results in one /search reply and the title length shown for each of them
+SEARCH_LIMIT = 10
+SEARCH_TITLE_CHARS = 200
+# Telegram message length limit
+MESSAGE_LIMIT = 4096
 
 
 async def addkeyword_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -12,7 +21,7 @@ async def addkeyword_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         await update.message.reply_text("Usage: /addkeyword <word>")
         return
     word = context.args[0]
-    add_keyword(word)
+    await async_storage.run(add_keyword, word)
     await update.message.reply_text(f"Added keyword: {word}")
 
 
@@ -21,12 +30,40 @@ async def removekeyword_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await update.message.reply_text("Usage: /removekeyword <word>")
         return
     word = context.args[0]
-    remove_keyword(word)
+    await async_storage.run(remove_keyword, word)
     await update.message.reply_text(f"Removed keyword: {word}")
 
 
 async def list_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    await update.message.reply_text(", ".join(KEYWORDS))
+    await update.message.reply_text(", ".join(keywords.get_keywords()))
+
+
+async def search_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Search archived projects without querying the sites."""
+    if not context.args:
+        await update.message.reply_text("Usage: /search <query>")
+        return
+    query = " ".join(context.args)
+    results = await async_storage.search_projects(query, SEARCH_LIMIT)
+    if not results:
+        await update.message.reply_text(f"Nothing found for: {query}")
+        return
+    text = ""
+    for project in results:
+        title = " ".join(project["title"].split())
+        if len(title) > SEARCH_TITLE_CHARS:
+            title = title[:SEARCH_TITLE_CHARS - 1].rstrip() + "…"
+        found = datetime.fromtimestamp(project["last_seen"]).strftime("%d.%m %H:%M")
+        details = " · ".join(filter(None, [project["source"], project["price"], found]))
+        block = (
+            f'🔹 <a href="{html.escape(project["link"])}">{html.escape(title)}</a>\n'
+            f"{html.escape(details)}"
+        )
+        # Long links or prices can still overflow the message: stop before the limit
+        if text and len(text) + len(block) + 2 > MESSAGE_LIMIT:
+            break
+        text = f"{text}\n\n{block}" if text else block
+    await update.message.reply_text(text, parse_mode="HTML", disable_web_page_preview=True)
 
 
 async def start_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -78,6 +115,7 @@ def create_application():
     app.add_handler(CommandHandler("addkeyword", addkeyword_cmd))
     app.add_handler(CommandHandler("removekeyword", removekeyword_cmd))
     app.add_handler(CommandHandler("list", list_cmd))
+    app.add_handler(CommandHandler("search", search_cmd))
     app.add_handler(CallbackQueryHandler(button_handler))
     
     # Настраиваем логирование